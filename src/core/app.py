@@ -5,6 +5,10 @@ import aiohttp
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from core.cache import PcmCache
+from core.ffmpeg import FfmpegPool
+from core.globals import TTS_CACHE_DIR
+from core.grpc import ChannelPool
 from core.routers.oai.router_audio import OAIAudioRouter
 from core.routers.oai.router_chat_completions import OAIChatCompletionsRouter
 from core.routers.oai.router_models import OAIModelsRouter
@@ -12,6 +16,7 @@ from core.routers.oai.router_transcriptions import OAIAudioTranscriptionsRouter
 from core.routers.oai.router_realtime import OAIRealtimeRouter
 from core.routers.router_base import BaseRouter
 from core.routers.router_models import ModelsRouter
+from core.routers.router_stats import StatsRouter
 from models.definitions import ModelAny, ModelLLMAny, ModelSTTAny, ModelTTSAny
 
 
@@ -35,6 +40,14 @@ class App(FastAPI):
         )
 
         self.http_session: aiohttp.ClientSession
+        self.grpc_channels = ChannelPool()
+        self.ffmpeg_pool = FfmpegPool()
+        self.speech_cache = PcmCache("speech", TTS_CACHE_DIR)
+        self.speech_memo = PcmCache( # short sentences of voice chats, memory only
+            "sentence", None,
+            max_memory_bytes=64 * 1024 * 1024,
+            max_entry_bytes=2 * 1024 * 1024,
+        )
         self.models = models
         self.add_event_handler("startup", self._startup_events)
         self.add_event_handler("shutdown", self._shutdown_events)
@@ -57,11 +70,19 @@ class App(FastAPI):
 
     async def _shutdown_events(self):
         await self.http_session.close()
+        self.grpc_channels.close()
+        await self.ffmpeg_pool.close()
 
     def _routers(self):
         return [
             BaseRouter(),
             ModelsRouter(models=self.models),
+            StatsRouter(
+                models=self.models,
+                grpc_channels=self.grpc_channels,
+                caches=[self.speech_cache, self.speech_memo],
+                ffmpeg_pool=self.ffmpeg_pool,
+            ),
 
             # OAI Routers
             OAIModelsRouter(
@@ -69,16 +90,27 @@ class App(FastAPI):
             ),
             OAIChatCompletionsRouter(
                 models=self.models,
-                http_session=self.http_session
+                http_session=self.http_session,
+                grpc_channels=self.grpc_channels,
+                speech_memo=self.speech_memo,
+                ffmpeg_pool=self.ffmpeg_pool,
             ),
             OAIAudioRouter(
                 models=[m for m in self.models if isinstance(m, ModelTTSAny)],
+                grpc_channels=self.grpc_channels,
+                speech_cache=self.speech_cache,
+                ffmpeg_pool=self.ffmpeg_pool,
             ),
             OAIAudioTranscriptionsRouter(
                 models=[m for m in self.models if isinstance(m, ModelSTTAny)],
+                grpc_channels=self.grpc_channels,
+                ffmpeg_pool=self.ffmpeg_pool,
             ),
             OAIRealtimeRouter(
                 models=self.models,
-                http_session=self.http_session
+                http_session=self.http_session,
+                grpc_channels=self.grpc_channels,
+                speech_memo=self.speech_memo,
+                ffmpeg_pool=self.ffmpeg_pool,
             ),
         ]
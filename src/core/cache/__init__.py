@@ -0,0 +1 @@
+from core.cache.pcm_cache import PcmCache, PcmCacheStats, speech_cache_key
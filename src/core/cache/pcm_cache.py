@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from core.executors import get_executor
+from core.logger import warn
+
+
+__all__ = ["PcmCache", "PcmCacheStats", "speech_cache_key"]
+
+
+def speech_cache_key(model: str, voice: str, speed: float, text: str) -> str:
+    """
+    Content address of synthesized speech: whitespace-normalized text batch, voice, speed and model
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    raw = json.dumps([model, voice, round(speed, 3), text], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PcmCacheStats(BaseModel):
+    name: str
+    memory_entries: int
+    memory_bytes: int
+    max_memory_bytes: int
+    disk_entries: int
+    disk_bytes: int
+    max_disk_bytes: int
+    hits_memory: int
+    hits_disk: int
+    misses: int
+    stores: int
+    evictions_memory: int
+    evictions_disk: int
+
+
+class PcmCache:
+    """
+    Raw PCM keyed by content address: a byte-bounded in-memory LRU in front of a byte-bounded on-disk tier.
+    Entries evicted from memory stay on disk, disk hits are promoted back to memory; without cache_dir it is memory only.
+    Lives on the gateway event loop; file IO goes to the executor.
+    """
+    def __init__(
+            self,
+            name: str,
+            cache_dir: Optional[Path],
+            max_memory_bytes: int = 256 * 1024 * 1024,
+            max_disk_bytes: int = 4 * 1024 * 1024 * 1024,
+            max_entry_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.name = name
+        self._cache_dir = cache_dir
+        self._max_memory = max_memory_bytes
+        self._max_disk = max_disk_bytes if cache_dir is not None else 0
+        self._max_entry = max_entry_bytes
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict() # key -> size, least recently used first
+        self._disk_bytes = 0
+
+        self._hits_memory = 0
+        self._hits_disk = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions_memory = 0
+        self._evictions_disk = 0
+
+        if cache_dir is not None:
+            self._load_disk_index(cache_dir)
+
+    def _load_disk_index(self, cache_dir: Path) -> None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        files = [(f.stat(), f) for f in cache_dir.glob("*/*.pcm")]
+        for st, f in sorted(files, key=lambda x: x[0].st_mtime):
+            self._disk[f.stem] = st.st_size
+            self._disk_bytes += st.st_size
+        self._unlink_files(self._evict_disk()) # still starting up, nothing waits on the loop yet
+
+    def _path(self, key: str) -> Path:
+        assert self._cache_dir is not None
+        return self._cache_dir / key[:2] / f"{key}.pcm"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._memory or key in self._disk
+
+    async def get(self, key: str) -> Optional[bytes]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self._hits_memory += 1
+            return data
+
+        if key in self._disk:
+            loop = asyncio.get_running_loop()
+            try:
+                data = await loop.run_in_executor(get_executor("io"), self._path(key).read_bytes)
+            except OSError as e:
+                warn(f"{self.name} cache: failed to read {key}: {e}")
+                await self._remove_files(self._drop_disk(key))
+            else:
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self._hits_disk += 1
+                self._put_memory(key, data)
+                return data
+
+        self._misses += 1
+        return None
+
+    async def put(self, key: str, data: bytes) -> None:
+        if not data or len(data) > self._max_entry or key in self:
+            return
+
+        self._stores += 1
+        self._put_memory(key, data)
+
+        if self._max_disk <= 0:
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(get_executor("io"), self._write_file, self._path(key), data)
+        except OSError as e:
+            warn(f"{self.name} cache: failed to write {key}: {e}")
+            return
+
+        if key not in self._disk:
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            await self._remove_files(self._evict_disk())
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _put_memory(self, key: str, data: bytes) -> None:
+        if len(data) > self._max_memory:
+            return
+
+        # concurrent disk hits on one key promote it more than once
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+
+        while self._memory_bytes > self._max_memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._evictions_memory += 1
+
+    def _drop_disk(self, key: str) -> List[Path]:
+        """
+        Removes the entry from the disk index; returns its file for the caller to unlink
+        """
+        size = self._disk.pop(key, None)
+        if size is None:
+            return []
+        self._disk_bytes -= size
+        return [self._path(key)]
+
+    def _evict_disk(self) -> List[Path]:
+        evicted = []
+        while self._disk_bytes > self._max_disk and self._disk:
+            key = next(iter(self._disk))
+            evicted += self._drop_disk(key)
+            self._evictions_disk += 1
+        return evicted
+
+    def _unlink_files(self, paths: List[Path]) -> None:
+        for path in paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                warn(f"{self.name} cache: failed to remove {path.stem}: {e}")
+
+    async def _remove_files(self, paths: List[Path]) -> None:
+        if not paths:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_executor("io"), self._unlink_files, paths)
+
+    def stats(self) -> PcmCacheStats:
+        return PcmCacheStats(
+            name=self.name,
+            memory_entries=len(self._memory),
+            memory_bytes=self._memory_bytes,
+            max_memory_bytes=self._max_memory,
+            disk_entries=len(self._disk),
+            disk_bytes=self._disk_bytes,
+            max_disk_bytes=self._max_disk,
+            hits_memory=self._hits_memory,
+            hits_disk=self._hits_disk,
+            misses=self._misses,
+            stores=self._stores,
+            evictions_memory=self._evictions_memory,
+            evictions_disk=self._evictions_disk,
+        )
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+__all__ = ["ExecutorParams", "ExecutorStats", "NamedExecutor", "configure_executors", "get_executor", "executor_stats"]
+
+
+class ExecutorParams(BaseModel):
+    inference: int = Field(ge=1, le=64, default=1) # model forward passes (STT recognize, TTS synthesis)
+    vad: int = Field(ge=1, le=16, default=1)
+    decode: int = Field(ge=1, le=64, default=4) # in-process audio decoding, tokenization
+    io: int = Field(ge=1, le=256, default=8) # disk reads and writes
+    sleep: int = Field(ge=1, le=1024, default=64) # threads parked on a stop event, one per monitored replica
+
+
+class ExecutorStats(BaseModel):
+    name: str
+    max_workers: int
+    busy: int
+    queued: int
+    completed: int
+    utilization: float # busy worker-seconds over available worker-seconds since start
+
+
+class NamedExecutor(ThreadPoolExecutor):
+    """
+    Thread pool of one workload, counting queued and running calls
+    """
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"{name}-executor")
+        self.name = name
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._busy = 0
+        self._completed = 0
+        self._busy_seconds = 0.
+        self._t_start = time.monotonic()
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        def run() -> Any:
+            with self._lock:
+                self._queued -= 1
+                self._busy += 1
+            t0 = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self._completed += 1
+                    self._busy_seconds += time.monotonic() - t0
+
+        def on_done(f: Future) -> None:
+            if f.cancelled(): # never started
+                with self._lock:
+                    self._queued -= 1
+
+        with self._lock:
+            self._queued += 1
+        future = super().submit(run)
+        future.add_done_callback(on_done)
+        return future
+
+    def stats(self) -> ExecutorStats:
+        with self._lock:
+            elapsed = max(time.monotonic() - self._t_start, 1e-9)
+            return ExecutorStats(
+                name=self.name,
+                max_workers=self.max_workers,
+                busy=self._busy,
+                queued=self._queued,
+                completed=self._completed,
+                utilization=round(self._busy_seconds / (elapsed * self.max_workers), 4),
+            )
+
+
+_params = ExecutorParams()
+_executors: Dict[str, NamedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def configure_executors(params: ExecutorParams) -> None:
+    """
+    Sizes executors created from now on; call at process start, before any work is submitted
+    """
+    global _params
+    _params = params
+
+
+def get_executor(name: str) -> NamedExecutor:
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            max_workers: Optional[int] = getattr(_params, name, None)
+            if max_workers is None:
+                raise KeyError(f"Unknown executor {name}, expected one of {', '.join(ExecutorParams.model_fields)}")
+            executor = NamedExecutor(name, max_workers)
+            _executors[name] = executor
+        return executor
+
+
+def executor_stats() -> List[ExecutorStats]:
+    with _executors_lock:
+        return [e.stats() for e in _executors.values()]
@@ -0,0 +1 @@
+from core.ffmpeg.pool import FfmpegPool, FfmpegPoolStats
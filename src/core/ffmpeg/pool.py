@@ -0,0 +1,161 @@
+import asyncio
+
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from core.logger import warn
+
+
+__all__ = ["FfmpegPool", "FfmpegPoolStats"]
+
+
+type Command = Tuple[str, ...]
+type Spawner = Callable[[Command], Awaitable[asyncio.subprocess.Process]]
+
+
+async def spawn_process(cmd: Command) -> asyncio.subprocess.Process:
+    return await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+
+@dataclass
+class _Counters:
+    name: str
+    spares: List[asyncio.subprocess.Process] = field(default_factory=list)
+    refill: Optional[asyncio.Task] = None # at most one per command, it tops up until spares_per_command
+    active: int = 0
+    warm: int = 0 # streams served by a pre-spawned process
+    cold: int = 0 # streams that had to spawn their own process
+    spawn_failed: int = 0
+
+
+class FfmpegPoolStats(BaseModel):
+    name: str
+    active: int
+    spares: int
+    warm: int
+    cold: int
+    spawn_failed: int
+    capacity: int
+    waiting: int
+
+
+class FfmpegPool:
+    """
+    Pre-spawned ffmpeg processes per command line, so a stream does not pay for process start and library loading.
+    An ffmpeg process serves exactly one stream (EOF on stdin ends it); spares are refilled in the background.
+    max_processes caps concurrently running streams. Lives on the gateway event loop.
+    """
+    def __init__(
+            self,
+            max_processes: int = 512,
+            spares_per_command: int = 2,
+            spawn: Spawner = spawn_process,
+    ):
+        self._max_processes = max_processes
+        self._spares_per_command = spares_per_command
+        self._spawn = spawn
+
+        self._sem = asyncio.Semaphore(max_processes)
+        self._waiting = 0
+        self._commands: Dict[Command, _Counters] = {}
+
+    async def _refill(self, cmd: Command, counters: _Counters) -> None:
+        while len(counters.spares) < self._spares_per_command:
+            try:
+                proc = await self._spawn(cmd)
+            except OSError as e:
+                counters.spawn_failed += 1
+                warn(f"ffmpeg pool: failed to spawn a spare for {counters.name}: {e}")
+                return
+            counters.spares.append(proc)
+
+    def _schedule_refill(self, cmd: Command, counters: _Counters) -> None:
+        if counters.refill is not None and not counters.refill.done():
+            return
+        counters.refill = asyncio.create_task(self._refill(cmd, counters))
+
+    async def acquire(self, name: str, cmd: List[str]) -> asyncio.subprocess.Process:
+        key: Command = tuple(cmd)
+        counters = self._commands.setdefault(key, _Counters(name=name))
+
+        self._waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self._waiting -= 1
+
+        try:
+            proc = None
+            while counters.spares:
+                spare = counters.spares.pop()
+                if spare.returncode is None:
+                    proc = spare
+                    break
+
+            if proc is not None:
+                counters.warm += 1
+            else:
+                counters.cold += 1
+                proc = await self._spawn(key)
+
+        except BaseException:
+            self._sem.release()
+            raise
+
+        counters.active += 1
+        self._schedule_refill(key, counters)
+        return proc
+
+    async def release(self, cmd: List[str], proc: asyncio.subprocess.Process) -> None:
+        counters = self._commands[tuple(cmd)]
+        try:
+            if proc.returncode is None:
+                try:
+                    proc.terminate()
+                    try:
+                        await asyncio.wait_for(proc.wait(), timeout=2.0)
+                    except asyncio.TimeoutError:
+                        proc.kill()
+                        await proc.wait()
+                except ProcessLookupError:
+                    pass
+        finally:
+            counters.active -= 1
+            self._sem.release()
+
+    async def close(self) -> None:
+        refills = [c.refill for c in self._commands.values() if c.refill is not None]
+        for refill in refills:
+            refill.cancel()
+        await asyncio.gather(*refills, return_exceptions=True) # no spare gets added behind our back
+
+        for counters in self._commands.values():
+            spares, counters.spares = counters.spares, []
+            for proc in spares:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                await proc.wait() # reaps it, no zombie left behind
+
+    def stats(self) -> List[FfmpegPoolStats]:
+        return [
+            FfmpegPoolStats(
+                name=c.name,
+                active=c.active,
+                spares=len(c.spares),
+                warm=c.warm,
+                cold=c.cold,
+                spawn_failed=c.spawn_failed,
+                capacity=self._max_processes,
+                waiting=self._waiting,
+            )
+            for c in self._commands.values()
+        ]
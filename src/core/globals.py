@@ -4,6 +4,9 @@ from core import BASE_DIR
 LOGS_DIR = BASE_DIR / "data" / "core" / "logs"
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+TTS_CACHE_DIR = BASE_DIR / "data" / "core" / "cache" / "tts"
+TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
 MODEL_CACHE_DIR = BASE_DIR / ".models-cache"
 TOKENIZERS_DIR = MODEL_CACHE_DIR / "tokenizers"
 MODELS_DIR = MODEL_CACHE_DIR / "models"
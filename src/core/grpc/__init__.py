@@ -0,0 +1 @@
+from core.grpc.channels import ChannelPool, ChannelPoolStats, is_connection_lost
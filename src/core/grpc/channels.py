@@ -0,0 +1,185 @@
+import asyncio
+import threading
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Tuple, List, Iterator
+
+from grpclib.client import Channel
+from grpclib.config import Configuration
+from grpclib.exceptions import StreamTerminatedError
+from pydantic import BaseModel
+
+from core.logger import info, warn
+
+
+__all__ = ["ChannelPool", "ChannelPoolStats", "is_connection_lost"]
+
+
+type ChannelKey = Tuple[asyncio.AbstractEventLoop, str, int]
+
+
+@dataclass
+class _PooledChannel:
+    channel: Channel
+    streams: int = 0
+    draining: bool = False # out of the pool, closed once its last stream ends
+
+
+@dataclass
+class _HostCounters:
+    opened: int = 0
+    discarded: int = 0
+    streams_started: int = 0
+    streams_reused: int = 0 # streams that went over an already established connection
+
+
+class ChannelPoolStats(BaseModel):
+    host: str
+    port: int
+    channels: int
+    active_streams: int
+    opened: int
+    discarded: int
+    streams_started: int
+    streams_reused: int
+
+
+class ChannelPool:
+    """
+    Long-lived gRPC channels, multiplexing many streams over a few HTTP/2 connections per (event loop, host, port).
+    grpclib binds a channel to the loop it was created in, so the gateway loop and
+    the status worker loop share this pool but never share a connection.
+    """
+    def __init__(
+            self,
+            max_channels: int = 4,
+            max_streams_per_channel: int = 64,
+            keepalive_time: float = 30.,
+            keepalive_timeout: float = 10.,
+    ):
+        self._max_channels = max_channels
+        self._max_streams = max_streams_per_channel
+        self._config = Configuration(
+            _keepalive_time=keepalive_time,
+            _keepalive_timeout=keepalive_timeout,
+            _keepalive_permit_without_calls=True,
+            _http2_max_pings_without_data=0,
+        )
+        self._channels: Dict[ChannelKey, List[_PooledChannel]] = {}
+        self._counters: Dict[Tuple[str, int], _HostCounters] = {}
+        self._lock = threading.Lock()
+
+    def _open(self, key: ChannelKey) -> _PooledChannel:
+        _, host, port = key
+        # connects lazily on the first call, reconnects on its own after connection loss
+        pooled = _PooledChannel(Channel(host, port, config=self._config))
+        self._channels.setdefault(key, []).append(pooled)
+        self._counters.setdefault((host, port), _HostCounters()).opened += 1
+        info(f"gRPC channel opened: {host}:{port}; channels={len(self._channels[key])}")
+        return pooled
+
+    def _pick(self, key: ChannelKey) -> _PooledChannel:
+        pooled = self._channels.get(key, [])
+        least_loaded = min(pooled, key=lambda p: p.streams, default=None)
+
+        if least_loaded is None:
+            return self._open(key)
+        if least_loaded.streams >= self._max_streams and len(pooled) < self._max_channels:
+            return self._open(key)
+        return least_loaded
+
+    def get(self, host: str, port: int) -> Channel:
+        """
+        Channel for short unary calls, e.g. ping; not counted against stream limits
+        """
+        key = (asyncio.get_running_loop(), host, port)
+        with self._lock:
+            return self._pick(key).channel
+
+    @contextmanager
+    def stream(self, host: str, port: int) -> Iterator[Channel]:
+        """
+        Reserves a stream slot on the least loaded channel, opening a new channel only when every
+        existing one is at max_streams_per_channel and max_channels is not reached yet
+        """
+        key = (asyncio.get_running_loop(), host, port)
+        with self._lock:
+            established = len(self._channels.get(key, []))
+            pooled = self._pick(key)
+            counters = self._counters[(host, port)]
+            counters.streams_started += 1
+            if established == len(self._channels[key]):
+                counters.streams_reused += 1
+            pooled.streams += 1
+
+        try:
+            yield pooled.channel
+        finally:
+            with self._lock:
+                pooled.streams -= 1
+                close = pooled.draining and pooled.streams == 0
+            if close:
+                pooled.channel.close()
+
+    def discard(self, host: str, port: int, channel: Channel) -> None:
+        """
+        Drops a channel that failed a call or a health check; the next call opens a fresh one.
+        Streams still running on it are left to finish, the channel is closed after the last one.
+        """
+        key = (asyncio.get_running_loop(), host, port)
+        with self._lock:
+            pooled = self._channels.get(key, [])
+            dropped = next((p for p in pooled if p.channel is channel), None)
+            if dropped is None:
+                return
+            self._channels[key] = [p for p in pooled if p is not dropped]
+            self._counters[(host, port)].discarded += 1
+            dropped.draining = True
+            streams = dropped.streams
+
+        warn(f"gRPC channel discarded: {host}:{port}; draining {streams} streams")
+        if streams == 0:
+            channel.close()
+
+    def close(self) -> None:
+        """
+        Closes channels that belong to the running loop
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [k for k in self._channels if k[0] is loop]
+            channels = [p.channel for k in keys for p in self._channels.pop(k)]
+        for channel in channels:
+            channel.close()
+
+    def stats(self) -> List[ChannelPoolStats]:
+        with self._lock:
+            results = []
+            for (host, port), counters in self._counters.items():
+                pooled = [
+                    p for (_, k_host, k_port), ps in self._channels.items()
+                    if (k_host, k_port) == (host, port)
+                    for p in ps
+                ]
+                results.append(ChannelPoolStats(
+                    host=host,
+                    port=port,
+                    channels=len(pooled),
+                    active_streams=sum(p.streams for p in pooled),
+                    opened=counters.opened,
+                    discarded=counters.discarded,
+                    streams_started=counters.streams_started,
+                    streams_reused=counters.streams_reused,
+                ))
+            return results
+
+
+def is_connection_lost(e: BaseException) -> bool:
+    """
+    Whether a failed call took its connection down, as opposed to a single stream reset by the peer;
+    grpclib raises StreamTerminatedError for both
+    """
+    if isinstance(e, StreamTerminatedError):
+        return not str(e).startswith("Stream reset")
+    return isinstance(e, ConnectionError)
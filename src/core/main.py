@@ -6,6 +6,7 @@ import uvicorn
 from core import BASE_DIR
 from core.app import App
 from core.globals import LOGS_DIR, PORT, YAML_CONFIG
+from core.executors import configure_executors
 from core.logger import init_logger, info
 from core.status.worker import spawn_worker as spawn_status_worker
 from models.config import Config, models_from_config
@@ -26,12 +27,13 @@ def main():
     info("Logger initialized")
 
     config = Config.read_yaml()
+    configure_executors(config.executors)
     models = models_from_config(config)
 
-    w_status = spawn_status_worker(models)
-
     app = App.new(models)
 
+    w_status = spawn_status_worker(models, app.grpc_channels)
+
     asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
     config = uvicorn.Config(
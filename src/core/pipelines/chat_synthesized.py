@@ -1,29 +1,59 @@
 import asyncio
 
-from typing import List, AsyncGenerator, Optional, Literal
+from typing import List, AsyncGenerator, Optional, Literal, Set, Tuple
 
 import pysbd
 
+from core.cache import PcmCache, speech_cache_key
+from core.ffmpeg import FfmpegPool
+from core.grpc import ChannelPool
 from core.logger import error
 from core.routers.oai.models import ChatCompletionsResponseStreaming, ChatDelta
 from core.routers.oai.sentence_collector import SentenceCollector
 from models.definitions import ModelTTSAny
+from models.replicas import pick_replica
 from tts.client import stream_audio
 from tts.inference.encode_audio_stream import encode_audio_stream
 from tts.inference.schemas import TTSAudioPost
 
 
+FIRST_CLAUSE_TOKENS = 12 # the first piece of speech is cut after this many LLM tokens at the latest
+MIN_BATCH_CHARS = 80
+CHARS_PER_BUFFERED_SECOND = 60 # batch growth per second of audio buffered ahead of playback
+
 async def stream_with_chat_synthesised(
+        grpc_channels: ChannelPool,
         tts_model: ModelTTSAny,
         a_post: TTSAudioPost,
         llm_stream: AsyncGenerator[ChatCompletionsResponseStreaming, None],
         segmenter: pysbd.Segmenter,
+        speech_memo: PcmCache,
 ) -> AsyncGenerator[str | bytes, None]:
+    def memo_key(text: str) -> str:
+        return speech_cache_key(a_post.model, a_post.voice, a_post.speed, text)
+
+    bytes_per_second = tts_model.record.constants.sample_rate * tts_model.record.constants.channels * 4 # float32
+    t_first_audio: Optional[float] = None
+    audio_emitted = 0
+
+    def batch_chars_limit() -> float:
+        """
+        Batches grow with the audio buffered ahead of playback: small while the listener waits,
+        up to the context limit once synthesis is far enough ahead
+        """
+        max_chars = tts_model.record.context_size * 0.9
+        if t_first_audio is None:
+            return min(MIN_BATCH_CHARS, max_chars)
+
+        played = asyncio.get_running_loop().time() - t_first_audio
+        ahead = max(0., audio_emitted / bytes_per_second - played)
+        return min(MIN_BATCH_CHARS + ahead * CHARS_PER_BUFFERED_SECOND, max_chars)
+
     text_queue: asyncio.Queue[str] = asyncio.Queue()
     SENTINEL = "<|GATEWAY::PRODUCER::STOP|>" # noqa
 
     async def producer():
-        collector = SentenceCollector(segmenter=segmenter)
+        collector = SentenceCollector(segmenter=segmenter, first_clause_tokens=FIRST_CLAUSE_TOKENS)
         try:
             llm_stream_iterator = llm_stream.__aiter__()
             while True:
@@ -49,16 +79,17 @@ async def stream_with_chat_synthesised(
         except Exception as e:
             error(f"Error {type(e)} in LLM stream producer: {str(e)}")
         finally:
+            await llm_stream.aclose() # an abandoned turn frees its llama.cpp slot now, not at garbage collection
             remaining = collector.flush()
             for sentence in remaining:
                 await text_queue.put(sentence)
             await text_queue.put(SENTINEL)
 
-    producer_task = asyncio.create_task(producer())
-    pending_item: Optional[str] = None
-    text_queue_stop = False
+    async def batches() -> AsyncGenerator[str, None]:
+        pending_item: Optional[str] = None
+        text_queue_stop = False
+        first = True
 
-    try:
         while True:
             if text_queue_stop:
                 break
@@ -68,14 +99,16 @@ async def stream_with_chat_synthesised(
                 pending_item = None
             else:
                 item = await text_queue.get()
+                text_queue.task_done() # a pending item was already marked done when it was taken
                 if item == SENTINEL:
                     break
 
             current_batch: List[str] = [item]
             chars_cnt = len(item)
-            text_queue.task_done()
+            chars_limit = batch_chars_limit()
 
-            while not text_queue.empty():
+            # the first clause goes out alone, it bounds the time to first audio
+            while not first and not text_queue.empty() and memo_key(item) not in speech_memo:
                 # todo: what if new item in context_size big?
                 next_item = None
                 try:
@@ -92,7 +125,13 @@ async def stream_with_chat_synthesised(
                     text_queue.task_done()
                     break
 
-                if chars_cnt + len(next_item) > tts_model.record.context_size * 0.9:
+                if chars_cnt + len(next_item) > chars_limit:
+                    pending_item = next_item
+                    text_queue.task_done()
+                    break
+
+                # memoized sentences go out on their own, so they are not folded into a batch that misses
+                if memo_key(next_item) in speech_memo:
                     pending_item = next_item
                     text_queue.task_done()
                     break
@@ -101,40 +140,95 @@ async def stream_with_chat_synthesised(
                 chars_cnt += len(next_item)
                 text_queue.task_done()
 
-            full_text = " ".join(current_batch)
-            try:
-                yield full_text
+            first = False
+            yield " ".join(current_batch)
+
+    async def synthesize(full_text: str, out: asyncio.Queue[Optional[bytes]]):
+        key = memo_key(full_text)
+        try:
+            cached = await speech_memo.get(key)
+            if cached is not None:
+                await out.put(cached)
+                return
 
-                a_post_clone = a_post.model_copy(update={"text": full_text})
+            a_post_clone = a_post.model_copy(update={"text": full_text})
 
-                audio_iterator = stream_audio(tts_model.config.container, a_post_clone).__aiter__()
+            audio_iterator = stream_audio(grpc_channels, pick_replica(tts_model.replicas), a_post_clone).__aiter__()
 
+            pcm = bytearray()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        audio_iterator.__anext__(),
+                        timeout=10.
+                    )
+                    pcm += chunk
+                    await out.put(chunk)
+
+                except StopAsyncIteration:
+                    await speech_memo.put(key, bytes(pcm))
+                    break
+        except Exception as e:
+            error(f"Error generating audio for batch '{full_text[:30]}...': {str(e)}")
+        finally:
+            await out.put(None)
+
+    # batches being synthesized or buffered, but not yet fully emitted: the current one plus the look-ahead
+    in_pipeline = asyncio.Semaphore(1 + tts_model.config.lookahead)
+    ordered: asyncio.Queue[Optional[Tuple[str, asyncio.Queue[Optional[bytes]]]]] = asyncio.Queue()
+    synth_tasks: Set[asyncio.Task] = set()
+
+    async def dispatcher():
+        try:
+            async for full_text in batches():
+                await in_pipeline.acquire()
+                out: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+                task = asyncio.create_task(synthesize(full_text, out))
+                synth_tasks.add(task)
+                task.add_done_callback(synth_tasks.discard)
+                await ordered.put((full_text, out))
+        finally:
+            await ordered.put(None)
+
+    producer_task = asyncio.create_task(producer())
+    dispatcher_task = asyncio.create_task(dispatcher())
+
+    try:
+        while True:
+            item = await ordered.get()
+            if item is None:
+                break
+
+            full_text, out = item
+            try:
+                yield full_text
                 while True:
-                    try:
-                        chunk = await asyncio.wait_for(
-                            audio_iterator.__anext__(),
-                            timeout=10.
-                        )
-                        yield chunk
-
-                    except StopAsyncIteration:
+                    chunk = await out.get()
+                    if chunk is None:
                         break
-            except Exception as e:
-                error(f"Error generating audio for batch '{full_text[:30]}...': {str(e)}")
+
+                    if t_first_audio is None:
+                        t_first_audio = asyncio.get_running_loop().time()
+                    audio_emitted += len(chunk)
+                    yield chunk
+            finally:
+                in_pipeline.release()
 
     finally:
-        if not producer_task.done():
-            producer_task.cancel()
-            try:
-                await producer_task
-            except asyncio.CancelledError:
-                pass
+        for task in [dispatcher_task, *synth_tasks, producer_task]:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
 
 async def encode_synthesized_stream(
         tts_model: ModelTTSAny,
         synthesizer: AsyncGenerator[str | bytes, None],
         output_format: Literal["pcm", "wav", "mp3", "ogg"],
+        ffmpeg_pool: FfmpegPool,
 ) -> AsyncGenerator[str | bytes, None]:
     audio_queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
     result_queue: asyncio.Queue[Optional[str | bytes]] = asyncio.Queue()
@@ -164,7 +258,8 @@ async def encode_synthesized_stream(
                 input_stream=audio_source(),
                 output_format=output_format,
                 sample_rate=tts_model.record.constants.sample_rate,
-                channels=tts_model.record.constants.channels
+                channels=tts_model.record.constants.channels,
+                ffmpeg_pool=ffmpeg_pool,
             ):
                 await result_queue.put(chunk)
         except Exception as e:
@@ -0,0 +1,96 @@
+import asyncio
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Coroutine, List, Optional, TypeVar
+
+import aiohttp
+
+from starlette.requests import Request
+
+from core.logger import info
+
+
+T = TypeVar("T")
+
+
+class DisconnectWatch:
+    """
+    Notices an HTTP client going away while its response is streamed, and closes the registered upstream
+    responses right then, also while the stream is waiting on upstream or parked in a send.
+    Starlette only finds out on the next failed send, and leaves the body generator to the GC.
+    """
+    def __init__(self, request: Request):
+        self._request = request
+        self._callbacks: List[Callable[[], object]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.disconnected = False
+
+    async def _watch(self) -> None:
+        while True:
+            message = await self._request.receive()
+            if message["type"] == "http.disconnect":
+                break
+
+        self.disconnected = True
+        info(f"client disconnected from {self._request.url.path}, closing {len(self._callbacks)} upstream responses")
+        for callback in self._callbacks:
+            callback()
+        self._callbacks.clear()
+
+    def on_disconnect(self, callback: Callable[[], object]) -> Callable[[], None]:
+        """
+        Registers a synchronous callback, e.g. aiohttp ClientResponse.close; returns its unregister function
+        """
+        if self.disconnected:
+            callback()
+            return lambda: None
+
+        self._callbacks.append(callback)
+
+        def unregister() -> None:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+        return unregister
+
+    @asynccontextmanager
+    async def upstream(self, request: Coroutine[Any, Any, aiohttp.ClientResponse]) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Sends an upstream request, e.g. http_session.post(...), and yields its response.
+        A disconnect cancels waiting for the response headers, which llama.cpp holds back during prefill,
+        and closes the response once it is there.
+        """
+        task = asyncio.ensure_future(request)
+        unregister = self.on_disconnect(task.cancel)
+        try:
+            response = await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if not self.disconnected or (current is not None and current.cancelling()):
+                raise
+            raise aiohttp.ClientConnectionError("client disconnected before the upstream response")
+        finally:
+            unregister()
+
+        unregister = self.on_disconnect(response.close)
+        try:
+            async with response:
+                yield response
+        finally:
+            unregister()
+
+    async def guard(self, stream: AsyncGenerator[T, None]) -> AsyncGenerator[T, None]:
+        """
+        Watches for the whole lifetime of the response stream; closes the stream when it ends either way
+        """
+        self._task = asyncio.create_task(self._watch())
+        try:
+            async for item in stream:
+                yield item
+
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError):
+            if not self.disconnected: # upstream closed by us, nobody to report to
+                raise
+
+        finally:
+            self._task.cancel()
+            await stream.aclose()
@@ -248,7 +248,7 @@ class TransRespSegment(BaseModel):
     type: Literal["transcript.text.segment"] = "transcript.text.segment"
     id: str # unique for every segment
     start: float
-    end_float: float
+    end: float
     text: str
     speaker: Optional[str] = None
 
@@ -256,6 +256,9 @@ class TransRespSegment(BaseModel):
     def generate_id() -> str:
         return f"seg_{secrets.token_hex(12)}"
 
+    def to_streaming(self) -> str:
+        return str_to_streaming(self.model_dump_json())
+
 
 class TransUsageTokenDetails(BaseModel):
     text_tokens: int
@@ -1,13 +1,23 @@
+from contextlib import aclosing
 from typing import List, AsyncGenerator
 
 import pysbd
 
+from core.cache import PcmCache, speech_cache_key
+from core.ffmpeg import FfmpegPool
+from core.grpc import ChannelPool
 from core.routers.oai.schemas import AudioPost
 from core.routers.oai.sentence_collector import SentenceCollector
+from core.routers.oai.utils import (
+    admit_models, lease_after_admission, release_after, admission_rejected_response, no_replica_response,
+    AdmittedStreamingResponse
+)
 from core.routers.router_base import BaseRouter
 from core.routers.schemas import error_constructor
+from models.admission import AdmissionRejected, Priority
 from models.definitions import ModelTTSAny
-from starlette.responses import StreamingResponse, Response
+from models.replicas import NoReplicaAvailable, ReplicaLease
+from starlette.responses import Response
 
 from tts.client import stream_audio
 from tts.inference.encode_audio_stream import encode_audio_stream
@@ -52,11 +62,17 @@ class OAIAudioRouter(BaseRouter):
     def __init__(
             self,
             models: List[ModelTTSAny],
+            grpc_channels: ChannelPool,
+            speech_cache: PcmCache,
+            ffmpeg_pool: FfmpegPool,
             *args, **kwargs
     ):
         super().__init__(*args, **kwargs)
         self.segmenter = pysbd.Segmenter(language="en", clean=False)
         self.models = models
+        self.grpc_channels = grpc_channels
+        self.speech_cache = speech_cache
+        self.ffmpeg_pool = ffmpeg_pool
         self.add_api_route("/oai/v1/audio/speech", self._generate_speech, methods=["POST"])
 
     async def _generate_speech(self, post: AudioPost):
@@ -64,16 +80,34 @@ class OAIAudioRouter(BaseRouter):
             assert isinstance(batches, list)
             assert isinstance(model, ModelTTSAny)
 
-            for batch in batches:
+            for idx, (batch, key) in enumerate(zip(batches, keys)):
+                cached = await self.speech_cache.get(key)
+                if cached is not None:
+                    yield cached
+                    continue
+
+                if not tickets:
+                    # evicted since the admission check; the response has started, so wait for a slot rather than fail
+                    tickets.append(await model.admission.acquire(Priority.batch, requeue=True))
+                    leases.append(ReplicaLease(model.replicas))
+                elif idx > 0:
+                    # long speech jobs step aside between batches while interactive requests wait
+                    await tickets[0].yield_to_interactive()
+
                 a_post = TTSAudioPost(
                     model=model.record.model,
                     text=batch,
                     voice=post.voice,
                     speed=post.speed
                 )
-                async for audio_ in stream_audio(model.config.container, a_post):
+                pcm = bytearray()
+                async for audio_ in stream_audio(self.grpc_channels, leases[0], a_post):
+                    pcm += audio_
                     yield audio_
 
+                # only batches synthesized to the end are stored
+                await self.speech_cache.put(key, bytes(pcm))
+
         async def streamer_encoded(stream: AsyncGenerator[bytes, None]):
             assert isinstance(model, ModelTTSAny)
 
@@ -82,6 +116,7 @@ class OAIAudioRouter(BaseRouter):
                 output_format=post.response_format,
                 sample_rate=model.record.constants.sample_rate,
                 channels=model.record.constants.channels,
+                ffmpeg_pool=self.ffmpeg_pool,
             ):
                 yield audio_
 
@@ -95,21 +130,33 @@ class OAIAudioRouter(BaseRouter):
 
         try:
             batches = chunkify_text(post.text, model, self.segmenter)
+            keys = [speech_cache_key(model.record.model, post.voice, post.speed, b) for b in batches]
 
-            gen_encoded = streamer_encoded(streamer())
+            # fully cached requests never reach the backend, so they skip admission
+            tickets = [] if all(k in self.speech_cache for k in keys) else await admit_models([model], Priority.batch)
+            leases = [lease_after_admission(model, tickets)] if tickets else []
+            gen_encoded = release_after(streamer_encoded(streamer()), tickets, leases)
 
             if post.stream:
-                return StreamingResponse(
+                return AdmittedStreamingResponse(
                     gen_encoded,
+                    tickets,
+                    leases,
                     media_type=post.media_type(),
                 )
 
             content = b""
-            async for audio in gen_encoded:
-                content += audio
+            async with aclosing(gen_encoded) as gen:
+                async for audio in gen:
+                    content += audio
 
             return Response(content=content, media_type=post.media_type())
 
+        except AdmissionRejected as e:
+            return admission_rejected_response(e)
+
+        except NoReplicaAvailable as e:
+            return no_replica_response(e)
 
         except Exception as e:
             return error_constructor(
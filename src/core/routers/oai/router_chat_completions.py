@@ -6,9 +6,13 @@ from typing import List, AsyncGenerator, Counter, Optional
 import aiohttp
 import pysbd
 
-from fastapi.responses import StreamingResponse, Response
+from fastapi import Request
+from fastapi.responses import Response
 from pydantic import BaseModel
 
+from core.cache import PcmCache
+from core.ffmpeg import FfmpegPool
+from core.grpc import ChannelPool
 from core.logger import exception, info
 from core.pipelines.chat_synthesized import stream_with_chat_synthesised, encode_synthesized_stream
 from core.routers.oai.models import (
@@ -16,11 +20,16 @@ from core.routers.oai.models import (
     ChatCompletionsResponseChoiceStreaming, ChatDelta, AudioResponse, ChatMessageSystem
 )
 from core.routers.oai.schemas import ChatPost, ChatPostAudio
-from core.routers.oai.utils import limit_messages, try_resolve_models
+from core.routers.oai.utils import (
+    limit_messages, try_resolve_models, admit_models, release_after, admission_rejected_response,
+    AdmittedStreamingResponse
+)
+from core.routers.disconnect import DisconnectWatch
 from core.routers.router_base import BaseRouter
 from core.routers.schemas import error_constructor
-from llm.client import stream_with_chat
+from llm.client import stream_with_chat, stream_raw_with_chat, routed_post
 from llm.models.prompts import LLM_TTS_PROMPT
+from models.admission import AdmissionRejected, Priority
 from models.definitions import ModelLLMAny, ModelTTSAny, ModelAny
 from tts.inference.schemas import TTSAudioPost
 
@@ -94,32 +103,47 @@ class OAIChatCompletionsRouter(BaseRouter):
             self,
             models: List[ModelAny],
             http_session: aiohttp.ClientSession,
+            grpc_channels: ChannelPool,
+            speech_memo: PcmCache,
+            ffmpeg_pool: FfmpegPool,
             *args, **kwargs
     ):
         super().__init__(*args, **kwargs)
         self.segmenter = pysbd.Segmenter(language="en", clean=False)
         self.models = models
         self.http_session = http_session
+        self.grpc_channels = grpc_channels
+        self.speech_memo = speech_memo
+        self.ffmpeg_pool = ffmpeg_pool
         self.add_api_route(f"/oai/v1/chat/completions", self._chat_completions, methods=["POST"])
 
-    async def _chat_completions(self, post: ChatPost):
-        async def chat_completions_streamer() -> AsyncGenerator[str, None]:
+    async def _chat_completions(self, post: ChatPost, request: Request):
+        async def chat_completions_streamer() -> AsyncGenerator[str | bytes, None]:
             assert r_models is not None
             assert r_models.llm is not None
 
             chat_post.consume_sampling_params(r_models.llm.sampling_params)
 
             if post.stream:
-                llm_stream = stream_with_chat(
-                    self.http_session,
-                    r_models.llm, chat_post
-                )
                 if r_models.tts is None:
-                    async for chunk in llm_stream:
-                        chunk.model = r_models.llm.record.resolve_name
-                        yield chunk.to_streaming()
+                    # text only: upstream frames are forwarded as bytes, without pydantic round-trips
+                    async for frame in stream_raw_with_chat(
+                        self.http_session,
+                        r_models.llm,
+                        chat_post,
+                        r_models.llm.record.resolve_name,
+                        disconnect,
+                    ):
+                        yield frame
 
                 else:
+                    llm_stream = stream_with_chat(
+                        self.http_session,
+                        r_models.llm,
+                        chat_post,
+                        disconnect,
+                    )
+
                     assert isinstance(r_models.tts, ModelTTSAny)
                     assert isinstance(post.audio, ChatPostAudio)
 
@@ -131,10 +155,12 @@ class OAIChatCompletionsRouter(BaseRouter):
                     )
 
                     synthesizer = stream_with_chat_synthesised(
+                        self.grpc_channels,
                         r_models.tts,
                         a_post,
                         llm_stream,
-                        self.segmenter
+                        self.segmenter,
+                        self.speech_memo,
                     )
                     resp_chunk_base = ChatCompletionsResponseStreaming(
                         id=ChatCompletionsResponseStreaming.generate_id(),
@@ -146,7 +172,8 @@ class OAIChatCompletionsRouter(BaseRouter):
                     async for chunk in encode_synthesized_stream(
                         r_models.tts,
                         synthesizer,
-                        post.audio.format
+                        post.audio.format,
+                        self.ffmpeg_pool,
                     ):
                         if "text" not in post.modalities and isinstance(chunk, str):
                             continue
@@ -171,14 +198,15 @@ class OAIChatCompletionsRouter(BaseRouter):
 
             else:
                 if r_models.tts is None:
-                    async with self.http_session.post(
-                        url=r_models.llm.urls.generate,
-                        json=post.model_dump(),
-                    ) as response:
-                        raw_comp = await response.json()
-                        comp = ChatCompletionsResponseNotStreaming.model_validate(raw_comp)
-                        comp.model = r_models.llm.record.resolve_name
-                        yield comp.model_dump_json()
+                    with r_models.llm.affinity.route(chat_post.messages) as route:
+                        async with disconnect.upstream(self.http_session.post(
+                            url=r_models.llm.urls_for(route.replica).generate,
+                            json=routed_post(chat_post, route).model_dump(),
+                        )) as response:
+                            raw_comp = await response.json()
+                            comp = ChatCompletionsResponseNotStreaming.model_validate(raw_comp)
+                            comp.model = r_models.llm.record.resolve_name
+                            yield comp.model_dump_json()
                 else:
                     raise ValueError("Voice modality is only supported with stream=True due to latency constraints.")
 
@@ -202,14 +230,20 @@ class OAIChatCompletionsRouter(BaseRouter):
 
             messages = include_system_if_needed(post, r_models.llm)
 
-            messages = limit_messages(messages, r_models.llm)
+            messages = await limit_messages(messages, r_models.llm, post.max_tokens)
             validate_messages(messages)
 
             chat_post = llm_chat_post_from_post(post, r_models.llm, messages)
 
-            streamer = chat_completions_streamer()
+            priority = Priority.interactive if post.stream else Priority.batch
+            tickets = await admit_models([r_models.llm, r_models.tts], priority)
+            disconnect = DisconnectWatch(request)
+            streamer = disconnect.guard(release_after(chat_completions_streamer(), tickets))
+
+            return AdmittedStreamingResponse(streamer, tickets, media_type="text/event-stream")
 
-            return StreamingResponse(streamer, media_type="text/event-stream")
+        except AdmissionRejected as e:
+            return admission_rejected_response(e)
 
         except asyncio.TimeoutError:
             return error_constructor(
@@ -1,5 +1,6 @@
 import time
 import asyncio
+from contextlib import aclosing
 from typing import List, AsyncGenerator, Tuple
 
 import aiohttp
@@ -7,18 +8,25 @@ import pysbd
 
 from fastapi import WebSocket, WebSocketDisconnect, status
 
+from core.cache import PcmCache
+from core.ffmpeg import FfmpegPool
+from core.grpc import ChannelPool
 from core.logger import error, info
 from core.pipelines.chat_synthesized import stream_with_chat_synthesised
-from core.routers.oai.models import ChatMessageUser, ChatMessageSystem, ChatMessageAssistant, ChatMessage
+from core.routers.oai.models import ChatMessageUser, ChatMessageSystem, ChatMessageAssistant
 from core.routers.oai.schemas import ChatPost
-from core.routers.oai.utils import limit_messages, try_resolve_models, ResolvedModels
+from core.routers.oai.utils import (
+    ContextWindow, try_resolve_models, ResolvedModels, admit_models, release_tickets
+)
 from core.routers.router_base import BaseRouter
 from generated.stt_service import SpeechTranscription, SpeechStop
 from llm.client import stream_with_chat
 from llm.models.prompts import LLM_TTS_PROMPT
 from stt.client import stream_transcriptions
 from stt.inference.ffmpeg_utils import get_pcm_stream
+from models.admission import AdmissionRejected, Priority
 from models.definitions import ModelAny
+from models.replicas import pick_replica
 from tts.inference.schemas import TTSAudioPost
 
 BYTES_PER_SECOND = int(24000 * 1 * 4 * 1.3)
@@ -53,11 +61,17 @@ class OAIRealtimeRouter(BaseRouter):
             self,
             models: List[ModelAny],
             http_session: aiohttp.ClientSession,
+            grpc_channels: ChannelPool,
+            speech_memo: PcmCache,
+            ffmpeg_pool: FfmpegPool,
             *args, **kwargs
     ):
         super().__init__(*args, **kwargs)
         self.segmenter = pysbd.Segmenter(language="en", clean=False)
         self.http_session = http_session
+        self.grpc_channels = grpc_channels
+        self.speech_memo = speech_memo
+        self.ffmpeg_pool = ffmpeg_pool
         self.models = models
 
         self.add_api_websocket_route(
@@ -87,6 +101,14 @@ class OAIRealtimeRouter(BaseRouter):
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=err)
             return
 
+        try:
+            # the STT stream is held for the whole session, LLM and TTS are admitted per turn
+            session_tickets = await admit_models([r_models.stt], Priority.interactive)
+        except AdmissionRejected as e:
+            await websocket.send_json({"error": str(e)})
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=str(e))
+            return
+
         user_input_queue: asyncio.Queue[str | None] = asyncio.Queue()
         audio_output_queue: asyncio.Queue[Tuple[bytes, int] | None] = asyncio.Queue()
 
@@ -114,9 +136,10 @@ class OAIRealtimeRouter(BaseRouter):
 
             try:
                 async for stt_resp in stream_transcriptions(
-                        r_models.stt.config.container,
+                        self.grpc_channels,
+                        pick_replica(r_models.stt.replicas),
                         r_models.stt.record.model,
-                        get_pcm_stream(websocket_stream_adapter())
+                        get_pcm_stream(websocket_stream_adapter(), self.ffmpeg_pool)
                 ):
                     if isinstance(stt_resp, SpeechStop):
                         current_turn_id += 1
@@ -139,9 +162,9 @@ class OAIRealtimeRouter(BaseRouter):
             assert r_models.llm is not None and r_models.tts is not None
 
             llm_post_base, tts_post = prepare_post_bases(r_models)
-            messages: List[ChatMessage] = [
+            context = ContextWindow(r_models.llm, [
                 ChatMessageSystem(content=LLM_TTS_PROMPT),
-            ]
+            ])
 
             while True:
                 user_text = await user_input_queue.get()
@@ -152,41 +175,58 @@ class OAIRealtimeRouter(BaseRouter):
                 interrupt_event.clear()
                 processing_turn_id = current_turn_id
 
-                messages.append(ChatMessageUser(content=user_text))
-                messages = limit_messages(messages, r_models.llm)
+                context.append(ChatMessageUser(content=user_text))
+                messages = await context.messages()
+
+                try:
+                    turn_tickets = await admit_models([r_models.llm, r_models.tts], Priority.interactive)
+                except AdmissionRejected as e:
+                    error(f"Turn {processing_turn_id} rejected: {e}")
+                    await websocket.send_json({"error": str(e)})
+                    continue
 
                 llm_post = llm_post_base.model_copy(update={"messages": messages})
-                llm_stream = stream_with_chat(self.http_session, r_models.llm, llm_post)
+                llm_stream = stream_with_chat(
+                    self.http_session,
+                    r_models.llm,
+                    llm_post
+                )
 
                 full_response_text = ""
                 interrupted = False
 
                 try:
-                    async for chunk in stream_with_chat_synthesised(
+                    async with aclosing(stream_with_chat_synthesised(
+                            self.grpc_channels,
                             r_models.tts,
                             tts_post,
                             llm_stream,
-                            self.segmenter
-                    ):
-                        if interrupt_event.is_set() or processing_turn_id != current_turn_id:
-                            interrupted = True
-                            break
-
-                        if isinstance(chunk, bytes):
-                            small_chunks = chunk_bytes(chunk, AUDIO_CHUNK_SIZE)
-                            for small_chunk in small_chunks:
-                                if interrupt_event.is_set():
-                                    break
-                                await audio_output_queue.put((small_chunk, processing_turn_id))
-
-                        if isinstance(chunk, str):
-                            full_response_text += chunk
+                            self.segmenter,
+                            self.speech_memo,
+                    )) as synthesized:
+                        async for chunk in synthesized:
+                            if interrupt_event.is_set() or processing_turn_id != current_turn_id:
+                                interrupted = True
+                                break
+
+                            if isinstance(chunk, bytes):
+                                small_chunks = chunk_bytes(chunk, AUDIO_CHUNK_SIZE)
+                                for small_chunk in small_chunks:
+                                    if interrupt_event.is_set():
+                                        break
+                                    await audio_output_queue.put((small_chunk, processing_turn_id))
+
+                            if isinstance(chunk, str):
+                                full_response_text += chunk
 
                 except Exception as e:
                     error(f"Error in LLM/TTS generation loop: {e}")
 
+                finally:
+                    release_tickets(turn_tickets)
+
                 content = full_response_text if not interrupted else f"{full_response_text} ... [user interrupted assistant here]"
-                messages.append(ChatMessageAssistant(content=content))
+                context.append(ChatMessageAssistant(content=content))
 
         async def run_ws_sender():
             last_sent_turn_id = -1
@@ -239,4 +279,6 @@ class OAIRealtimeRouter(BaseRouter):
             try:
                 await task
             except asyncio.CancelledError:
-                pass
\ No newline at end of file
+                pass
+
+        release_tickets(session_tickets)
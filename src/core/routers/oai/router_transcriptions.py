@@ -2,15 +2,22 @@ from pathlib import Path
 from typing import List, AsyncGenerator
 
 from fastapi import UploadFile, File, Form
-from starlette.responses import StreamingResponse
 
-from core.routers.oai.models import TransRespDelta
+from core.ffmpeg import FfmpegPool
+from core.grpc import ChannelPool
+from core.routers.oai.models import TransRespDelta, TransRespSegment
+from core.routers.oai.utils import (
+    admit_models, lease_after_admission, release_after, admission_rejected_response, no_replica_response,
+    AdmittedStreamingResponse
+)
 from core.routers.router_base import BaseRouter
 from core.routers.schemas import error_constructor
 from generated.stt_service import SpeechTranscription
+from models.admission import AdmissionRejected, Priority
 from models.definitions import ModelSTTAny
+from models.replicas import NoReplicaAvailable
 from stt.client import stream_transcriptions
-from stt.inference.ffmpeg_utils import get_pcm_stream, file_to_stream
+from stt.inference.decode import get_upload_pcm_stream
 
 
 SUPPORTED_EXTENSIONS = ["wav", "mp3", "ogg", "flac", "opus"]
@@ -20,10 +27,14 @@ class OAIAudioTranscriptionsRouter(BaseRouter):
     def __init__(
             self,
             models: List[ModelSTTAny],
+            grpc_channels: ChannelPool,
+            ffmpeg_pool: FfmpegPool,
             *args, **kwargs
     ):
         super().__init__(*args, **kwargs)
         self.models = models
+        self.grpc_channels = grpc_channels
+        self.ffmpeg_pool = ffmpeg_pool
 
         self.add_api_route("/oai/v1/audio/transcriptions", self._transcriptions, methods=["POST"])
 
@@ -36,17 +47,23 @@ class OAIAudioTranscriptionsRouter(BaseRouter):
             assert a_model is not None
             assert file is not None
 
-            pcm_stream = get_pcm_stream(
-                file_to_stream(file)
-            )
+            pcm_stream = get_upload_pcm_stream(file, self.ffmpeg_pool)
 
             async for resp in stream_transcriptions(
-                    a_model.config.container,
+                    self.grpc_channels,
+                    lease,
                     a_model.record.model,
-                    pcm_stream
+                    pcm_stream,
+                    offline=True,
             ):
                 if isinstance(resp, SpeechTranscription):
                     yield TransRespDelta(delta=resp.text).to_streaming()
+                    yield TransRespSegment(
+                        id=TransRespSegment.generate_id(),
+                        start=resp.start,
+                        end=resp.end,
+                        text=resp.text,
+                    ).to_streaming()
 
         a_model = next((m for m in self.models if m.record.resolve_name == model), None)
         if not a_model:
@@ -72,7 +89,20 @@ class OAIAudioTranscriptionsRouter(BaseRouter):
             )
 
         try:
-            return StreamingResponse(streamer(), media_type="text/plain")
+            tickets = await admit_models([a_model], Priority.batch)
+            lease = lease_after_admission(a_model, tickets)
+            return AdmittedStreamingResponse(
+                release_after(streamer(), tickets, [lease]),
+                tickets,
+                [lease],
+                media_type="text/plain",
+            )
+
+        except AdmissionRejected as e:
+            return admission_rejected_response(e)
+
+        except NoReplicaAvailable as e:
+            return no_replica_response(e)
 
         except Exception as e:
             return error_constructor(
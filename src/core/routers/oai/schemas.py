@@ -55,6 +55,10 @@ class ChatPost(BaseModel):
     repetition_penalty: Optional[float] = None
     presence_penalty: Optional[float] = None
 
+    # llama.cpp prompt cache, set by the gateway
+    id_slot: Optional[int] = None
+    cache_prompt: Optional[bool] = None
+
     @classmethod
     @field_validator('modalities')
     def validate_modalities(cls, v: List[str]) -> List[str]:
@@ -1,11 +1,24 @@
+import re
+from typing import Optional
+
 import pysbd
 
 
+# comma, semicolon, colon, dashes, and sentence ends pysbd would still hold back as possibly incomplete
+CLAUSE_BOUNDARY = re.compile(r"[,;:.!?\u2014\u2013](?=\s)|\s-(?=\s)")
+FIRST_CLAUSE_MIN_CHARS = 8 # shorter leading fragments synthesize with poor prosody
+
+
 class SentenceCollector:
+    """
+    first_clause_tokens: when set, the first piece is cut early, at the first clause boundary or after that many tokens,
+    so speech can start before the first sentence is complete; whole sentences after that
+    """
     def __init__(
             self, 
             segmenter: pysbd.Segmenter,
             min_check_interval: int = 30,
+            first_clause_tokens: Optional[int] = None,
     ):
         self._segmenter = segmenter
         self._buffer = ""
@@ -13,6 +26,10 @@ class SentenceCollector:
         self._token_counter = 0
         self._trigger_chars = {'.', '!', '?', '\n'}
 
+        self._first_clause_tokens = first_clause_tokens
+        self._first_emitted = first_clause_tokens is None
+        self._first_token_counter = 0
+
     def put(self, token: str) -> list[str]:
         if not token:
             return []
@@ -20,6 +37,12 @@ class SentenceCollector:
         self._buffer += token
         self._token_counter += 1
 
+        if not self._first_emitted:
+            self._first_token_counter += 1
+            clause = self._take_first_clause()
+            if clause:
+                return [clause]
+
         is_punctuation = any(char in token for char in self._trigger_chars)
 
         if is_punctuation or self._token_counter >= self._min_check_interval:
@@ -27,6 +50,23 @@ class SentenceCollector:
 
         return []
 
+    def _take_first_clause(self) -> Optional[str]:
+        assert self._first_clause_tokens is not None
+
+        cut = -1
+        match = CLAUSE_BOUNDARY.search(self._buffer, FIRST_CLAUSE_MIN_CHARS)
+        if match:
+            cut = match.end()
+        elif self._first_token_counter >= self._first_clause_tokens:
+            cut = self._buffer.rstrip().rfind(" ") # the last word may be unfinished
+
+        if cut < FIRST_CLAUSE_MIN_CHARS:
+            return None
+
+        clause, self._buffer = self._buffer[:cut], self._buffer[cut:].lstrip()
+        self._first_emitted = True
+        return clause
+
     def flush(self) -> list[str]:
         if not self._buffer.strip():
             return []
@@ -45,6 +85,7 @@ class SentenceCollector:
             complete_sentences = parts[:-1]
             # The last part is incomplete; keep it in the buffer
             self._buffer = parts[-1]
+            self._first_emitted = True
 
             # Filter empty strings just in case
             return [s for s in complete_sentences if s.strip()]
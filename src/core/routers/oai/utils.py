@@ -1,10 +1,20 @@
 import secrets
 from dataclasses import dataclass
-from typing import Iterable, Any, Dict, List, Optional
+from typing import Iterable, Any, Dict, List, Optional, AsyncGenerator, Sequence, TypeVar
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 from core.logger import info
 from core.routers.oai.models import ChatMessage, ChatMessageSystem
+from core.routers.schemas import error_constructor
+from models.admission import AdmissionTicket, AdmissionRejected, Priority
 from models.definitions import ModelLLMAny, ModelTTSAny, ModelSTTAny, ModelAny
+from models.replicas import NoReplicaAvailable, ReplicaLease
+
+
+T = TypeVar("T")
 
 
 @dataclass
@@ -19,45 +29,91 @@ def generate_chat_completion_id(prefix: str) -> str:
     return f"{prefix}-{unique_suffix}"
 
 
-def count_tokens(s: str) -> int:
-    return len(s) // 4
+MESSAGE_OVERHEAD_TOKENS = 4 # role markers and separators the chat template wraps each message in
 
 
-def limit_messages(
-        messages: List[ChatMessage],
-        model: ModelAny
-) -> List[ChatMessage]:
-    new_messages = []
+def context_budget(model: ModelLLMAny, max_tokens: Optional[int] = None) -> int:
+    """
+    Prompt tokens that fit in the context next to the completion
+    """
+    reserve = model.sampling_params.max_tokens
+    if max_tokens is not None:
+        reserve = min(reserve, max_tokens)
+
+    context_size = model.record.context_size
+    return context_size - min(reserve, context_size // 2)
 
-    messages_tok_limit: int = int(model.record.context_size * 0.95)
 
-    take_messages = [
-        isinstance(m, ChatMessageSystem) for m in messages
-    ]
-    tok_count = sum([
-        count_tokens(m.content) for (m, take) in zip(messages, take_messages) if take
-    ])
+async def count_message_tokens(messages: List[ChatMessage], model: ModelLLMAny) -> List[int]:
+    counts = await model.token_counter.count([m.content for m in messages])
+    return [c + MESSAGE_OVERHEAD_TOKENS for c in counts]
 
-    take_messages.reverse()
-    messages.reverse()
 
-    for (message, take) in zip(messages, take_messages):
-        if take:
-            new_messages.append(message)
+async def limit_messages(
+        messages: List[ChatMessage],
+        model: ModelLLMAny,
+        max_tokens: Optional[int] = None,
+) -> List[ChatMessage]:
+    """
+    System messages are always kept, then the most recent messages that fit; the caller's list is left untouched
+    """
+    messages_tok_limit = context_budget(model, max_tokens)
+    counts = await count_message_tokens(messages, model)
+
+    take = [isinstance(m, ChatMessageSystem) for m in messages]
+    tok_count = sum(c for (c, t) in zip(counts, take) if t)
+
+    for idx in range(len(messages) - 1, -1, -1):
+        if take[idx]:
             continue
 
-        m_tokens = count_tokens(message.content)
-        if tok_count + m_tokens > messages_tok_limit:
+        if tok_count + counts[idx] > messages_tok_limit:
             break
 
-        tok_count += m_tokens
-        new_messages.append(message)
-
-    new_messages.reverse()
+        tok_count += counts[idx]
+        take[idx] = True
 
     info(f"model={model.record.resolve_name}; {tok_count=}; {messages_tok_limit=}")
 
-    return new_messages
+    return [m for (m, t) in zip(messages, take) if t]
+
+
+class ContextWindow:
+    """
+    Conversation history of a long-lived session, trimmed to the model's context.
+    Keeps a running token total, so each trim only tokenizes the messages appended since the previous one.
+    """
+    def __init__(self, model: ModelLLMAny, messages: Optional[List[ChatMessage]] = None):
+        self._model = model
+        self._budget = context_budget(model)
+
+        self._messages: List[ChatMessage] = []
+        self._counts: List[int] = []
+        self._pending: List[ChatMessage] = list(messages or [])
+        self._total = 0
+
+    def append(self, message: ChatMessage) -> None:
+        self._pending.append(message)
+
+    async def messages(self) -> List[ChatMessage]:
+        if self._pending:
+            pending, self._pending = self._pending, []
+            counts = await count_message_tokens(pending, self._model)
+            self._messages.extend(pending)
+            self._counts.extend(counts)
+            self._total += sum(counts)
+
+        # drop the oldest turns first; system messages and the latest message stay
+        while self._total > self._budget:
+            idx = next((i for i, m in enumerate(self._messages) if not isinstance(m, ChatMessageSystem)), None)
+            if idx is None or idx == len(self._messages) - 1:
+                break
+            self._messages.pop(idx)
+            self._total -= self._counts.pop(idx)
+
+        info(f"model={self._model.record.resolve_name}; tok_count={self._total}; messages_tok_limit={self._budget}")
+
+        return list(self._messages)
 
 
 def convert_messages_to_chat_format(
@@ -105,3 +161,93 @@ def try_resolve_models(model_name: str, models: List[Any]) -> ResolvedModels | s
         tts=resolved_models["tts"][0] if resolved_models["tts"] else None,
         stt=resolved_models["stt"][0] if resolved_models["stt"] else None,
     )
+
+
+async def admit_models(
+        models: Iterable[Optional[ModelAny]],
+        priority: Priority = Priority.batch,
+) -> List[AdmissionTicket]:
+    tickets = []
+    try:
+        for model in models:
+            if model is not None:
+                tickets.append(await model.admission.acquire(priority))
+    except BaseException:
+        release_tickets(tickets)
+        raise
+    return tickets
+
+
+def release_tickets(tickets: Iterable[AdmissionTicket | ReplicaLease]) -> None:
+    for ticket in tickets:
+        ticket.release()
+
+
+def lease_after_admission(model: ModelTTSAny | ModelSTTAny, tickets: List[AdmissionTicket]) -> ReplicaLease:
+    """
+    Picks and leases the replica once the request is admitted, so the pick sees current counts;
+    raises NoReplicaAvailable, with the tickets released, before any response is started
+    """
+    try:
+        return ReplicaLease(model.replicas)
+    except BaseException:
+        release_tickets(tickets)
+        raise
+
+
+async def release_after(
+        stream: AsyncGenerator[T, None],
+        tickets: List[AdmissionTicket],
+        leases: Sequence[ReplicaLease] = (),
+) -> AsyncGenerator[T, None]:
+    try:
+        async for item in stream:
+            yield item
+    finally:
+        release_tickets(tickets)
+        release_tickets(leases)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Releases the admission tickets and replica leases when the response ends either way, also when the client
+    leaves before the body iterator first runs and its finally blocks never get to
+    """
+    def __init__(
+            self,
+            content: AsyncGenerator[Any, None],
+            tickets: List[AdmissionTicket],
+            leases: Sequence[ReplicaLease] = (),
+            **kwargs: Any,
+    ):
+        super().__init__(content, **kwargs)
+        self._content = content
+        self._tickets = tickets
+        self._leases = leases
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                await self._content.aclose()
+            finally:
+                release_tickets(self._tickets)
+                release_tickets(self._leases)
+
+
+def admission_rejected_response(e: AdmissionRejected) -> Response:
+    return error_constructor(
+        message=str(e),
+        error_type="rate_limit_exceeded",
+        status_code=429,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def no_replica_response(e: NoReplicaAvailable) -> Response:
+    return error_constructor(
+        message=str(e),
+        error_type="service_unavailable",
+        status_code=503,
+    )
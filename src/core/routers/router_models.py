@@ -7,6 +7,7 @@ from starlette import status
 from core.routers.router_base import BaseRouter
 from core.routers.schemas import ErrorResponse, error_constructor
 from models.definitions import ModelAny
+from models.status import Status
 
 
 class ModelStatus(BaseModel):
@@ -16,12 +17,19 @@ class ModelStatus(BaseModel):
     running: bool
 
 
+class ReplicaResponse(BaseModel):
+    address: str
+    in_flight: int
+    status: ModelStatus
+
+
 class ModelResponse(BaseModel):
     id: str
     caps: List[str]
     object: Literal["model"] = "model"
     created: int
     status: ModelStatus
+    replicas: List[ReplicaResponse]
 
 
 class ModelsResponse(BaseModel):
@@ -29,6 +37,15 @@ class ModelsResponse(BaseModel):
     data: List[ModelResponse]
 
 
+def model_status(s: Status) -> ModelStatus:
+    return ModelStatus(
+        ping_ok=s.ping_ok,
+        request_ok=s.request_ok,
+        error=s.error,
+        running=s.running
+    )
+
+
 class ModelsRouter(BaseRouter):
     def __init__(
             self,
@@ -63,12 +80,15 @@ class ModelsRouter(BaseRouter):
                         id=m.record.resolve_name,
                         caps=m.record.caps,
                         created=int(time.time()),
-                        status=ModelStatus(
-                            ping_ok=m.status.ping_ok,
-                            request_ok=m.status.request_ok,
-                            error=m.status.error,
-                            running=m.status.running
-                        ),
+                        status=model_status(m.status),
+                        replicas=[
+                            ReplicaResponse(
+                                address=r.address,
+                                in_flight=r.in_flight,
+                                status=model_status(r.status),
+                            )
+                            for r in m.replicas
+                        ],
                     )
                     for m in self.models
                 ]
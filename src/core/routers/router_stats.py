@@ -0,0 +1,234 @@
+from typing import Literal, List
+
+from pydantic import BaseModel
+from starlette import status
+
+from core.cache import PcmCache, PcmCacheStats
+from core.executors import ExecutorStats, executor_stats
+from core.ffmpeg import FfmpegPool, FfmpegPoolStats
+from core.grpc import ChannelPool, ChannelPoolStats
+from core.routers.router_base import BaseRouter
+from core.routers.schemas import ErrorResponse, error_constructor
+from models.admission import AdmissionStats
+from models.affinity import AffinityStats
+from models.definitions import ModelAny, ModelLLMAny
+
+
+class GrpcStatsResponse(BaseModel):
+    object: Literal["list"] = "list"
+    data: List[ChannelPoolStats]
+
+
+class AdmissionStatsResponse(BaseModel):
+    object: Literal["list"] = "list"
+    data: List[AdmissionStats]
+
+
+class AffinityStatsResponse(BaseModel):
+    object: Literal["list"] = "list"
+    data: List[AffinityStats]
+
+
+class FfmpegStatsResponse(BaseModel):
+    object: Literal["list"] = "list"
+    data: List[FfmpegPoolStats]
+
+
+class ExecutorStatsResponse(BaseModel):
+    object: Literal["list"] = "list"
+    data: List[ExecutorStats]
+
+
+class CacheStatsResponse(BaseModel):
+    object: Literal["list"] = "list"
+    data: List[PcmCacheStats]
+
+
+class StatsRouter(BaseRouter):
+    def __init__(
+            self,
+            models: List[ModelAny],
+            grpc_channels: ChannelPool,
+            caches: List[PcmCache],
+            ffmpeg_pool: FfmpegPool,
+            *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.models = models
+        self.grpc_channels = grpc_channels
+        self.caches = caches
+        self.ffmpeg_pool = ffmpeg_pool
+
+        self.add_api_route(
+            "/v0/stats/grpc",
+            self._grpc,
+            methods=["GET"],
+            status_code=status.HTTP_200_OK,
+            responses={
+                200: dict(
+                    description="Returns gRPC channel pool usage per host: open channels, active streams, connection reuse",
+                    model=GrpcStatsResponse
+                ),
+                500: dict(
+                    description="Internal server error",
+                    model=ErrorResponse,
+                ),
+            }
+        )
+
+        self.add_api_route(
+            "/v0/stats/admission",
+            self._admission,
+            methods=["GET"],
+            status_code=status.HTTP_200_OK,
+            responses={
+                200: dict(
+                    description="Returns per-model admission control: in-flight requests, queue depth, wait times, rejections",
+                    model=AdmissionStatsResponse
+                ),
+                500: dict(
+                    description="Internal server error",
+                    model=ErrorResponse,
+                ),
+            }
+        )
+
+        self.add_api_route(
+            "/v0/stats/cache",
+            self._cache,
+            methods=["GET"],
+            status_code=status.HTTP_200_OK,
+            responses={
+                200: dict(
+                    description="Returns synthesized audio caches: memory and disk usage, hits, misses, evictions",
+                    model=CacheStatsResponse
+                ),
+                500: dict(
+                    description="Internal server error",
+                    model=ErrorResponse,
+                ),
+            }
+        )
+
+        self.add_api_route(
+            "/v0/stats/affinity",
+            self._affinity,
+            methods=["GET"],
+            status_code=status.HTTP_200_OK,
+            responses={
+                200: dict(
+                    description="Returns per-LLM prompt cache affinity: known conversation prefixes, hits, misses, pinned slots",
+                    model=AffinityStatsResponse
+                ),
+                500: dict(
+                    description="Internal server error",
+                    model=ErrorResponse,
+                ),
+            }
+        )
+
+        self.add_api_route(
+            "/v0/stats/ffmpeg",
+            self._ffmpeg,
+            methods=["GET"],
+            status_code=status.HTTP_200_OK,
+            responses={
+                200: dict(
+                    description="Returns ffmpeg encoder/decoder pool usage per command: active streams, warm spares, warm and cold starts",
+                    model=FfmpegStatsResponse
+                ),
+                500: dict(
+                    description="Internal server error",
+                    model=ErrorResponse,
+                ),
+            }
+        )
+
+        self.add_api_route(
+            "/v0/stats/executors",
+            self._executors,
+            methods=["GET"],
+            status_code=status.HTTP_200_OK,
+            responses={
+                200: dict(
+                    description="Returns gateway thread pools per workload: size, busy and queued calls, utilization",
+                    model=ExecutorStatsResponse
+                ),
+                500: dict(
+                    description="Internal server error",
+                    model=ErrorResponse,
+                ),
+            }
+        )
+
+    async def _grpc(self):
+        try:
+            return GrpcStatsResponse(
+                data=self.grpc_channels.stats()
+            )
+        except Exception as e:
+            return error_constructor(
+                message=f"Internal server error: {str(e)}",
+                error_type="internal_server_error",
+                status_code=500
+            )
+
+    async def _admission(self):
+        try:
+            return AdmissionStatsResponse(
+                data=[m.admission.stats() for m in self.models]
+            )
+        except Exception as e:
+            return error_constructor(
+                message=f"Internal server error: {str(e)}",
+                error_type="internal_server_error",
+                status_code=500
+            )
+
+    async def _cache(self):
+        try:
+            return CacheStatsResponse(
+                data=[c.stats() for c in self.caches]
+            )
+        except Exception as e:
+            return error_constructor(
+                message=f"Internal server error: {str(e)}",
+                error_type="internal_server_error",
+                status_code=500
+            )
+
+    async def _affinity(self):
+        try:
+            return AffinityStatsResponse(
+                data=[m.affinity.stats() for m in self.models if isinstance(m, ModelLLMAny)]
+            )
+        except Exception as e:
+            return error_constructor(
+                message=f"Internal server error: {str(e)}",
+                error_type="internal_server_error",
+                status_code=500
+            )
+
+    async def _ffmpeg(self):
+        try:
+            return FfmpegStatsResponse(
+                data=self.ffmpeg_pool.stats()
+            )
+        except Exception as e:
+            return error_constructor(
+                message=f"Internal server error: {str(e)}",
+                error_type="internal_server_error",
+                status_code=500
+            )
+
+    async def _executors(self):
+        try:
+            return ExecutorStatsResponse(
+                data=executor_stats()
+            )
+        except Exception as e:
+            return error_constructor(
+                message=f"Internal server error: {str(e)}",
+                error_type="internal_server_error",
+                status_code=500
+            )
@@ -1,4 +1,5 @@
 import json
+from typing import Optional, Dict
 
 from pydantic import BaseModel
 from fastapi import Response
@@ -16,7 +17,8 @@ class ErrorResponse(BaseModel):
 def error_constructor(
         message: str,
         error_type: str,
-        status_code: int
+        status_code: int,
+        headers: Optional[Dict[str, str]] = None,
 ) -> Response:
     """
     Example:
@@ -33,5 +35,6 @@ def error_constructor(
     return Response(
         status_code=status_code,
         content=json.dumps(error_response.model_dump()),
-        media_type="application/json"
+        media_type="application/json",
+        headers=headers,
     )
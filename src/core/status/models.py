@@ -2,6 +2,8 @@ from enum import Enum
 from dataclasses import dataclass
 from typing import Any
 
+from models.replicas import Replica
+
 
 class TaskType(Enum):
     ping = "ping"
@@ -12,3 +14,4 @@ class TaskType(Enum):
 class Task:
     task_type: TaskType
     model: Any
+    replica: Replica
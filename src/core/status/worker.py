@@ -5,10 +5,13 @@ from typing import List, Callable, Awaitable
 
 import aiohttp
 
+from core.grpc import ChannelPool
+from core.executors import get_executor
 from core.logger import info, exception
 from core.status.models import TaskType, Task
 from core.abstract import Worker
 from models.definitions import ModelAny, ModelLLMAny, ModelTTSAny, ModelSTTAny
+from models.replicas import Replica
 from llm.status import task_worker as task_worker_llm
 from tts.status import task_worker as task_worker_tts
 from stt.status import task_worker as task_worker_stt
@@ -16,56 +19,59 @@ from stt.status import task_worker as task_worker_stt
 
 async def smart_sleep(stop_event: threading.Event, delay: float) -> bool:
     loop = asyncio.get_running_loop()
-    is_stopped = await loop.run_in_executor(None, stop_event.wait, delay)
+    is_stopped = await loop.run_in_executor(get_executor("sleep"), stop_event.wait, delay)
     return is_stopped
 
 
-async def monitor_single_model(
+async def monitor_single_replica(
         model: ModelAny,
+        replica: Replica,
         a_session: aiohttp.ClientSession,
+        channels: ChannelPool,
         stop_event: threading.Event,
-        task_worker: Callable[[asyncio.AbstractEventLoop, aiohttp.ClientSession, float, Task], Awaitable[None]],
+        task_worker: Callable[[asyncio.AbstractEventLoop, aiohttp.ClientSession, ChannelPool, float, Task], Awaitable[None]],
 ):
     loop = asyncio.get_running_loop()
     t0 = loop.time()
-    info(f"MODEL {model.record.resolve_name}: Start status worker")
+    info(f"MODEL {model.record.resolve_name} @ {replica.address}: Start status worker")
 
     while not stop_event.is_set():
         try:
-            if not model.status.ping_ok:
-                next_task = Task(TaskType.ping, model)
-            elif not model.status.request_ok:
-                next_task = Task(TaskType.request, model)
+            if not replica.status.ping_ok:
+                next_task = Task(TaskType.ping, model, replica)
+            elif not replica.status.request_ok:
+                next_task = Task(TaskType.request, model, replica)
             else:
-                next_task = Task(TaskType.ping, model)
+                next_task = Task(TaskType.ping, model, replica)
 
             await task_worker(
                 loop,
                 a_session,
+                channels,
                 t0,
                 next_task,
             )
 
-            if not model.status.ping_ok:
+            if not replica.status.ping_ok:
                 delay = 5.0
-            elif not model.status.request_ok:
+            elif not replica.status.request_ok:
                 delay = 5.0
             else:
                 delay = 30.
 
             if await smart_sleep(stop_event, delay):
-                info(f"MODEL {model.record.resolve_name}: Stop signal received. Exiting loop.")
+                info(f"MODEL {model.record.resolve_name} @ {replica.address}: Stop signal received. Exiting loop.")
                 break
 
         except Exception as e:
             err = str(e)
-            model.status.error = err
-            exception(f"MODEL {model.record.model}: {err}")
+            replica.status.error = err
+            exception(f"MODEL {model.record.model} @ {replica.address}: {err}")
             if await smart_sleep(stop_event, 10.0):
                 break
 
 
-async def _async_entrypoint(models: List[ModelAny], stop_event: threading.Event):
+async def _async_entrypoint(models: List[ModelAny], channels: ChannelPool, stop_event: threading.Event):
     connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
     timeout = aiohttp.ClientTimeout(total=60)
 
@@ -83,20 +89,24 @@ async def _async_entrypoint(models: List[ModelAny], stop_event: threading.Event)
             else:
                 raise ValueError(f"Unknown model type: {type(model)}")
 
-            tasks.append(asyncio.create_task(monitor_single_model(
-                model, a_session, stop_event, task_worker
-            )))
+            for replica in model.replicas:
+                tasks.append(asyncio.create_task(monitor_single_replica(
+                    model, replica, a_session, channels, stop_event, task_worker
+                )))
 
-            info(f"MODEL {model.record.resolve_name}: Start status worker")
+            info(f"MODEL {model.record.resolve_name}: Start status workers for {len(model.replicas)} replicas")
 
-        await asyncio.gather(*tasks)
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            channels.close()
 
 
-def worker_thread_target(models: List[ModelAny], stop_event: threading.Event):
+def worker_thread_target(models: List[ModelAny], channels: ChannelPool, stop_event: threading.Event):
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     try:
-        loop.run_until_complete(_async_entrypoint(models, stop_event))
+        loop.run_until_complete(_async_entrypoint(models, channels, stop_event))
     finally:
         try:
             _tasks = asyncio.all_tasks(loop)
@@ -107,11 +117,11 @@ def worker_thread_target(models: List[ModelAny], stop_event: threading.Event):
         loop.close()
 
 
-def spawn_worker(models: List[ModelAny]) -> Worker:
+def spawn_worker(models: List[ModelAny], channels: ChannelPool) -> Worker:
     stop_event = threading.Event()
     worker_thread = threading.Thread(
         target=worker_thread_target,
-        args=(models, stop_event),
+        args=(models, channels, stop_event),
         daemon=True
     )
     worker_thread.start()
@@ -1,25 +1,106 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional, Tuple
 
 import aiohttp
+import ujson as json
 
+from core.routers.disconnect import DisconnectWatch
 from core.routers.oai.models import ChatCompletionsResponseStreaming
 from core.routers.oai.schemas import ChatPost
 from core.routers.utils import parse_sse_streaming
+from models.affinity import SlotRoute
 from models.definitions import ModelLLMAny
 
 
+def routed_post(post: ChatPost, route: SlotRoute) -> ChatPost:
+    """
+    Pins the request to the llama.cpp slot holding its prefix; other backends ignore the fields
+    """
+    return post.model_copy(update={"id_slot": route.slot, "cache_prompt": True})
+
+
 async def stream_with_chat(
         http_session: aiohttp.ClientSession,
         model: ModelLLMAny,
         post: ChatPost,
+        disconnect: Optional[DisconnectWatch] = None,
 ) -> AsyncGenerator[ChatCompletionsResponseStreaming, None]:
+    """
+    Closing the upstream response, on disconnect or when the stream is abandoned, makes llama.cpp stop generating
+    """
     if not post.stream:
         raise ValueError(f"post.stream should be True, got post.stream={post.stream}")
 
-    async with http_session.post(
-        url=model.urls.generate,
-        json=post.model_dump(),
-    ) as response:
-        async for chunk in parse_sse_streaming(response.content):
-            if chunk:
-                yield ChatCompletionsResponseStreaming.model_validate(chunk)
+    with model.affinity.route(post.messages) as route:
+        request = http_session.post(
+            url=model.urls_for(route.replica).generate,
+            json=routed_post(post, route).model_dump(),
+        )
+        async with (disconnect.upstream(request) if disconnect else request) as response:
+            async for chunk in parse_sse_streaming(response.content):
+                if chunk:
+                    yield ChatCompletionsResponseStreaming.model_validate(chunk)
+
+
+def _model_field(name: str) -> bytes:
+    return b'"model":' + json.dumps(name, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+
+def _rewrite_model_slow(data: bytes, model_name: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """
+    Parses a frame whose model field is not known yet: returns the rewritten frame,
+    and the byte pattern of the upstream model field if the frame contains it verbatim
+    """
+    try:
+        frame = json.loads(data)
+    except (json.JSONDecodeError, ValueError):
+        return None, None
+    if not isinstance(frame, dict) or not isinstance(frame.get("model"), str):
+        return data, None
+
+    source = _model_field(frame["model"])
+    frame["model"] = model_name
+    rewritten = json.dumps(frame, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+    return rewritten, source if source in data else None
+
+
+async def stream_raw_with_chat(
+        http_session: aiohttp.ClientSession,
+        model: ModelLLMAny,
+        post: ChatPost,
+        model_name: str,
+        disconnect: Optional[DisconnectWatch] = None,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Upstream SSE frames forwarded as bytes, only the model field is rewritten to model_name.
+    The upstream model field is learned from the first frame, later frames get a plain byte substitution.
+    """
+    if not post.stream:
+        raise ValueError(f"post.stream should be True, got post.stream={post.stream}")
+
+    target = _model_field(model_name)
+    source: Optional[bytes] = None
+
+    with model.affinity.route(post.messages) as route:
+        request = http_session.post(
+            url=model.urls_for(route.replica).generate,
+            json=routed_post(post, route).model_dump(),
+        )
+        async with (disconnect.upstream(request) if disconnect else request) as response:
+            async for line in response.content:
+                line = line.strip()
+                if not line.startswith(b"data: "):
+                    continue
+
+                data = line[6:]
+                if data == b"[DONE]":
+                    break
+
+                if source is not None and source in data:
+                    data = data.replace(source, target, 1)
+                else:
+                    data, learned = _rewrite_model_slow(data, model_name)
+                    if data is None:
+                        continue
+                    source = learned or source
+
+                yield b"data: " + data + b"\n\n"
@@ -1,23 +1,30 @@
 from enum import Enum
-from typing import Literal, Optional, Any
+from typing import Literal, Optional, Any, List
 
 from pydantic import BaseModel, field_validator, Field, model_validator
 
 from llm.models.model_record import SamplingParams
+from models.admission import AdmissionParams
 from llm.models.engine_params import EngineParamsLlamacpp
 
 
 class ModelConfig(BaseModel):
     model: str
     sampling_params: Optional[SamplingParams] = None
+    admission: AdmissionParams = Field(default_factory=AdmissionParams)
 
     @property
     def base_url(self) -> str:
         raise NotImplementedError(f"url property not implemented in ModelConfig")
 
+    @property
+    def base_urls(self) -> List[str]:
+        raise NotImplementedError(f"base_urls property not implemented in ModelConfig")
+
 
 class ModelConfigLocal(ModelConfig):
     container: str
+    replicas: List[str] = Field(default_factory=list) # additional containers serving the same model on the same port
     port: int = Field(ge=1, le=65535)
     engine_params: Optional[Any] = None # child is responsible for validation
 
@@ -25,6 +32,10 @@ class ModelConfigLocal(ModelConfig):
     def base_url(self) -> str:
         return f"http://{self.container}:{self.port}"
 
+    @property
+    def base_urls(self) -> List[str]:
+        return [f"http://{c}:{self.port}" for c in [self.container, *self.replicas]]
+
 
 class ModelLocalBackend(Enum):
     llamacpp = "llamacpp"
@@ -45,11 +56,16 @@ class ModelConfigLocalLlamaCpp(ModelConfigLocal):
 
 class ModelConfigRemote(ModelConfig):
     url: str
+    replicas: List[str] = Field(default_factory=list) # additional urls serving the same model
 
     @property
     def base_url(self) -> str:
         return self.url
 
+    @property
+    def base_urls(self) -> List[str]:
+        return [self.url, *self.replicas]
+
     @classmethod
     @field_validator("url")
     def validate_url(cls, v):
@@ -1,7 +1,7 @@
 from functools import partial
-from typing import Optional, Any
+from typing import Optional, Any, List
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, ConfigDict
 from transformers import AutoTokenizer
 
 from core.globals import TOKENIZERS_DIR
@@ -12,6 +12,10 @@ from llm.models import (
     ModelConfigLocalAny, ModelConfigRemoteAny, ModelConfigAny
 )
 from llm.models.records import RECORDS
+from llm.tokens import TokenCounter
+from models.admission import AdmissionLimiter
+from models.affinity import PrefixAffinity
+from models.replicas import Replica, replicas_status
 from models.status import Status
 
 
@@ -19,7 +23,14 @@ class ModelBase(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     tokenizer: Any
-    status: Status = Field(default_factory=Status)
+    token_counter: TokenCounter
+    replicas: List[Replica]
+    admission: AdmissionLimiter
+    affinity: PrefixAffinity
+
+    @property
+    def status(self) -> Status:
+        return replicas_status(self.replicas)
 
 
 def try_get_tokenizer(record: ModelRecordAny) -> Any:
@@ -48,8 +59,14 @@ class ModelLocal(ModelBase):
 
     @classmethod
     def new(cls, record: ModelRecordLocalAny, config: ModelConfigLocalAny) -> 'ModelLocal':
+        replicas = [Replica(address=url) for url in config.base_urls]
+        tokenizer = try_get_tokenizer(record)
         return cls(
-            tokenizer=try_get_tokenizer(record),
+            tokenizer=tokenizer,
+            token_counter=TokenCounter(tokenizer),
+            replicas=replicas,
+            admission=AdmissionLimiter(record.resolve_name, config.admission),
+            affinity=PrefixAffinity(record.resolve_name, replicas),
             record=record,
             config=config
         )
@@ -67,6 +84,9 @@ class ModelLocal(ModelBase):
         assert isinstance(self.record.urls, URLsLocalAny)
         return self.record.urls
 
+    def urls_for(self, replica: Replica) -> URLsLocalAny:
+        return self.urls.model_copy(update={"url": replica.address})
+
 
 class ModelRemote(ModelBase):
     record: ModelRecordRemoteAny
@@ -74,8 +94,14 @@ class ModelRemote(ModelBase):
 
     @classmethod
     def new(cls, record: ModelRecordRemoteAny, config: ModelConfigRemoteAny) -> 'ModelRemote':
+        replicas = [Replica(address=url) for url in config.base_urls]
+        tokenizer = try_get_tokenizer(record)
         return cls(
-            tokenizer=try_get_tokenizer(record),
+            tokenizer=tokenizer,
+            token_counter=TokenCounter(tokenizer),
+            replicas=replicas,
+            admission=AdmissionLimiter(record.resolve_name, config.admission),
+            affinity=PrefixAffinity(record.resolve_name, replicas),
             record=record,
             config=config
         )
@@ -90,6 +116,9 @@ class ModelRemote(ModelBase):
         assert isinstance(self.record.urls, URLsRemoteAny)
         return self.record.urls
 
+    def urls_for(self, replica: Replica) -> URLsRemoteAny:
+        return self.urls.model_copy(update={"url": replica.address})
+
 
 ModelAny = ModelLocal | ModelRemote
 
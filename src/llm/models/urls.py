@@ -10,6 +10,10 @@ class URLsLlamaCpp(URLs):
     def generate(self) -> str:
         return f"{self.url}/v1/chat/completions"
 
+    @property
+    def props(self) -> str:
+        return f"{self.url}/props"
+
 
 class URLsLmStudio(URLs):
     pass
@@ -1,35 +1,63 @@
 import asyncio
+from typing import Optional
 
 import aiohttp
 
-from core.logger import error
+from core.grpc import ChannelPool
+from core.logger import error, info
 from core.status.models import Task, TaskType
+from llm.models.urls import URLsLlamaCpp
 
 
 STARTUP_TIME: float = 360.
 
 
+async def fetch_total_slots(a_session: aiohttp.ClientSession, urls: URLsLlamaCpp) -> Optional[int]:
+    try:
+        async with a_session.get(
+                urls.props,
+                timeout=aiohttp.ClientTimeout(total=3),
+        ) as resp:
+            if resp.status != 200:
+                return None
+            props = await resp.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+    slots = props.get("total_slots") if isinstance(props, dict) else None
+    return slots if isinstance(slots, int) and slots > 0 else None
+
+
 async def task_worker(
         loop: asyncio.AbstractEventLoop,
         a_session: aiohttp.ClientSession,
+        _channels: ChannelPool,
         t0: float,
         task: Task,
 ):
+    urls = task.model.urls_for(task.replica)
+    status = task.replica.status
+    name = f"{task.model.record.model} @ {task.replica.address}"
+
     try:
         if task.task_type == TaskType.ping:
             async with a_session.get(
-                    task.model.urls.ping,
+                    urls.ping,
                     timeout=aiohttp.ClientTimeout(total=3),
             ) as resp:
                 if resp.status == 200:
-                    task.model.status.ping_ok = True
+                    status.ping_ok = True
+                    if isinstance(urls, URLsLlamaCpp) and task.replica.slots is None:
+                        task.replica.slots = await fetch_total_slots(a_session, urls)
+                        if task.replica.slots is not None:
+                            info(f"MODEL {name}: {task.replica.slots} slots")
                 else:
                     if loop.time() - t0 > STARTUP_TIME:
                         text = await resp.text()
                         err = f"PING FAILED: {text}"
-                        task.model.status.ping_ok = False
-                        task.model.status.error = err
-                        error(f"MODEL {task.model.record.model}: {err}")
+                        status.ping_ok = False
+                        status.error = err
+                        error(f"MODEL {name}: {err}")
 
         elif task.task_type == TaskType.request:
             payload = {
@@ -41,32 +69,32 @@ async def task_worker(
                 "model": task.model.record.model,
             }
             async with a_session.post(
-                    task.model.urls.generate,
+                    urls.generate,
                     json=payload, timeout=aiohttp.ClientTimeout(total=10)
             ) as resp:
                 if resp.status == 200:
-                    task.model.status.request_ok = True
-                    if task.model.status.error is not None:
-                        task.model.status.error = None
+                    status.request_ok = True
+                    if status.error is not None:
+                        status.error = None
                 else:
                     if loop.time() - t0 > STARTUP_TIME:
                         text = await resp.text()
                         err = f"REQUEST FAILED: {text}"
-                        task.model.status.request_ok = False
-                        task.model.status.error = err
-                        error(f"MODEL {task.model.record.model}: {err}")
+                        status.request_ok = False
+                        status.error = err
+                        error(f"MODEL {name}: {err}")
 
         else:
             raise ValueError(f"Unknown task type: {task.task_type}")
     except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         if task.task_type == TaskType.ping:
-            task.model.status.ping_ok = False
+            status.ping_ok = False
         elif task.task_type == TaskType.request:
-            task.model.status.request_ok = False
+            status.request_ok = False
         else:
             raise ValueError(f"Unknown task type: {task.task_type}")
 
         if loop.time() - t0 > STARTUP_TIME:
             err = f"NETWORK ERROR: {str(e)}"
-            task.model.status.error = err
-            error(f"MODEL {task.model.record.model}: {err}")
+            status.error = err
+            error(f"MODEL {name}: {err}")
@@ -0,0 +1,53 @@
+import asyncio
+import hashlib
+import threading
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence
+
+from core.executors import get_executor
+
+
+class TokenCounter:
+    """
+    Token counts of message contents with the model's HF tokenizer, cached by content hash.
+    Tokenization runs in the executor; the tokenizer is not shared between threads concurrently.
+    """
+    def __init__(self, tokenizer: Any, max_entries: int = 16384):
+        self._tokenizer = tokenizer
+        self._max_entries = max_entries
+        self._counts: OrderedDict[bytes, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _tokenize(self, texts: List[str]) -> List[int]:
+        with self._lock:
+            encoded = self._tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    async def count(self, texts: Sequence[str]) -> List[int]:
+        keys = [self._key(t) for t in texts]
+
+        counts: Dict[bytes, int] = {}
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in self._counts:
+                self._counts.move_to_end(key)
+                counts[key] = self._counts[key]
+            else:
+                missing[key] = text
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            new_counts = await loop.run_in_executor(get_executor("decode"), self._tokenize, list(missing.values()))
+            for key, cnt in zip(missing, new_counts):
+                counts[key] = cnt
+                self._counts[key] = cnt
+
+            while len(self._counts) > self._max_entries:
+                self._counts.popitem(last=False)
+
+        return [counts[key] for key in keys]
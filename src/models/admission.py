@@ -0,0 +1,223 @@
+import asyncio
+import math
+
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Set
+
+from pydantic import BaseModel, Field
+
+
+class Priority(Enum):
+    interactive = "interactive" # realtime turns, streaming chat
+    batch = "batch" # speech files, file transcriptions, non-streaming chat
+
+
+class AdmissionParams(BaseModel):
+    max_in_flight: int = Field(ge=1, default=16)
+    max_queue: int = Field(ge=0, default=64)
+    queue_timeout: float = Field(gt=0., default=10.) # seconds a request may wait for a slot
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionStats(BaseModel):
+    name: str
+    max_in_flight: int
+    in_flight: int
+    max_queue: int
+    queued: int
+    queued_interactive: int
+    queued_batch: int
+    admitted: int
+    rejected: int
+    timed_out: int
+    displaced: int # queued batch requests rejected to make room for interactive ones
+    yielded: int # slots handed from running batch requests to waiting interactive ones
+    wait_ms_avg: float
+    wait_ms_max: float
+
+
+class AdmissionTicket:
+    def __init__(self, limiter: "AdmissionLimiter", priority: Priority, t_admitted: float):
+        self._limiter = limiter
+        self._priority = priority
+        self._t_admitted = t_admitted
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._limiter._release(self._t_admitted)
+
+    async def yield_to_interactive(self) -> None:
+        """
+        Pre-emption point for long batch work: if interactive requests are waiting,
+        hands them the slot and queues up again behind them
+        """
+        if self._released or self._priority == Priority.interactive:
+            return
+        if not self._limiter._waiters[Priority.interactive]:
+            return
+
+        self._limiter._yielded += 1
+        self.release()
+        ticket = await self._limiter.acquire(self._priority, requeue=True)
+        self._t_admitted = ticket._t_admitted
+        self._released = False
+
+
+class AdmissionLimiter:
+    """
+    Per-model concurrency limit with bounded FIFO wait queues, one per priority.
+    Requests beyond max_in_flight wait for a slot up to queue_timeout; when the queues are full they are rejected at once.
+    Freed slots go to interactive waiters first, batch requests only get a slot when no interactive request waits.
+    Lives on the gateway event loop.
+    """
+    def __init__(self, name: str, params: AdmissionParams):
+        self.name = name
+        self.params = params
+
+        self._in_flight = 0
+        self._waiters: Dict[Priority, Deque[asyncio.Future]] = {p: deque() for p in Priority}
+        self._requeued: Set[asyncio.Future] = set() # waiters of requests already streaming, never displaced
+
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._displaced = 0
+        self._yielded = 0
+        self._wait_total = 0.
+        self._wait_max = 0.
+        self._hold_ewma = 1. # seconds a request keeps its slot, smoothed
+
+    @property
+    def _queued(self) -> int:
+        return sum(len(w) for w in self._waiters.values())
+
+    def _retry_after(self) -> int:
+        expected = self._hold_ewma * (self._queued + 1) / self.params.max_in_flight
+        return min(60, max(1, math.ceil(expected)))
+
+    def _record_wait(self, wait: float) -> None:
+        self._admitted += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+
+    def _can_enter(self, priority: Priority) -> bool:
+        if self._in_flight >= self.params.max_in_flight:
+            return False
+        if priority == Priority.interactive:
+            return not self._waiters[Priority.interactive]
+        return self._queued == 0
+
+    def _make_room(self, priority: Priority) -> bool:
+        if self._queued < self.params.max_queue:
+            return True
+        if priority != Priority.interactive:
+            return False
+
+        batch = self._waiters[Priority.batch]
+        for waiter in reversed(batch): # the most recent batch request has waited the least
+            if waiter.done() or waiter in self._requeued:
+                continue
+            batch.remove(waiter)
+            self._displaced += 1
+            waiter.set_exception(AdmissionRejected(
+                f"Model {self.name} is overloaded: request displaced by interactive traffic",
+                self._retry_after()
+            ))
+            return True
+        return False
+
+    async def acquire(self, priority: Priority = Priority.batch, requeue: bool = False) -> AdmissionTicket:
+        """
+        requeue: a request that already sends its response, e.g. one that yielded its slot;
+        it skips the queue bound and the deadline and is never displaced
+        """
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+
+        if self._can_enter(priority):
+            self._in_flight += 1
+            self._record_wait(0.)
+            return AdmissionTicket(self, priority, t0)
+
+        if not requeue and not self._make_room(priority):
+            self._rejected += 1
+            raise AdmissionRejected(
+                f"Model {self.name} is overloaded: {self._in_flight} requests in flight, {self._queued} queued",
+                self._retry_after()
+            )
+
+        waiters = self._waiters[priority]
+        waiter = loop.create_future()
+        if requeue:
+            waiters.appendleft(waiter) # it was admitted before everyone else in its class
+            self._requeued.add(waiter)
+        else:
+            waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=None if requeue else self.params.queue_timeout)
+
+        except asyncio.TimeoutError:
+            # the slot could have been handed over as the deadline hit
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._release(loop.time())
+            self._timed_out += 1
+            raise AdmissionRejected(
+                f"Model {self.name} is overloaded: no slot within {self.params.queue_timeout:.1f}s",
+                self._retry_after()
+            )
+
+        except asyncio.CancelledError:
+            # the slot could have been handed over right before the cancellation
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._release(loop.time())
+            raise
+
+        finally:
+            if waiter in waiters:
+                waiters.remove(waiter)
+            self._requeued.discard(waiter)
+
+        t_admitted = loop.time()
+        self._record_wait(t_admitted - t0)
+        return AdmissionTicket(self, priority, t_admitted)
+
+    def _release(self, t_admitted: float) -> None:
+        hold = asyncio.get_running_loop().time() - t_admitted
+        self._hold_ewma = 0.9 * self._hold_ewma + 0.1 * hold
+
+        for priority in Priority:
+            waiters = self._waiters[priority]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None) # the slot passes to the waiter, in_flight stays the same
+                    return
+
+        self._in_flight -= 1
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            name=self.name,
+            max_in_flight=self.params.max_in_flight,
+            in_flight=self._in_flight,
+            max_queue=self.params.max_queue,
+            queued=self._queued,
+            queued_interactive=len(self._waiters[Priority.interactive]),
+            queued_batch=len(self._waiters[Priority.batch]),
+            admitted=self._admitted,
+            rejected=self._rejected,
+            timed_out=self._timed_out,
+            displaced=self._displaced,
+            yielded=self._yielded,
+            wait_ms_avg=self._wait_total / self._admitted * 1000 if self._admitted else 0.,
+            wait_ms_max=self._wait_max * 1000,
+        )
@@ -0,0 +1,154 @@
+import hashlib
+import itertools
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Iterator
+
+from pydantic import BaseModel
+
+from models.replicas import Replica, pick_replica
+
+
+def prefix_hashes(messages: Sequence[BaseModel]) -> List[str]:
+    """
+    Rolling hash of every message prefix: hashes[i] addresses messages[:i + 1]
+    """
+    h = hashlib.sha256()
+    hashes = []
+    for message in messages:
+        h.update(message.model_dump_json().encode("utf-8"))
+        h.update(b"\x00")
+        hashes.append(h.copy().hexdigest())
+    return hashes
+
+
+@dataclass
+class SlotRoute:
+    replica: Replica
+    slot: Optional[int] # llama.cpp id_slot, None when the replica's slots are unknown or all busy
+    hit: bool
+
+
+@dataclass
+class _Slot:
+    conversation: int = -1
+    busy: int = 0
+    last_used: float = 0.
+
+
+@dataclass
+class _Pin:
+    replica: Replica
+    slot: Optional[int]
+    conversation: int
+
+
+class AffinityStats(BaseModel):
+    name: str
+    prefixes: int
+    hits: int
+    misses: int
+    slots_pinned: int
+
+
+class PrefixAffinity:
+    """
+    Routes a conversation back to the replica, and the llama.cpp slot, that already holds its prompt in the KV cache.
+    The longest known message prefix wins; a slot taken over by another conversation invalidates its old prefixes.
+    Lives on the gateway event loop.
+    """
+    def __init__(self, name: str, replicas: List[Replica], max_prefixes: int = 4096):
+        self.name = name
+        self.replicas = replicas
+        self._max_prefixes = max_prefixes
+
+        self._prefixes: OrderedDict[str, _Pin] = OrderedDict()
+        self._slots: Dict[str, List[_Slot]] = {}
+        self._conversations = itertools.count()
+
+        self._hits = 0
+        self._misses = 0
+
+    def _replica_slots(self, replica: Replica) -> List[_Slot]:
+        slots = self._slots.get(replica.address)
+        if slots is None or len(slots) != (replica.slots or 0):
+            slots = [_Slot() for _ in range(replica.slots or 0)]
+            self._slots[replica.address] = slots
+        return slots
+
+    def _lookup(self, hashes: List[str]) -> Optional[_Pin]:
+        for h in reversed(hashes):
+            pin = self._prefixes.get(h)
+            if pin is None:
+                continue
+
+            if not pin.replica.status.running:
+                return None
+            if pin.slot is None:
+                return pin
+
+            slots = self._replica_slots(pin.replica)
+            if pin.slot >= len(slots):
+                return None
+            slot = slots[pin.slot]
+            if slot.conversation != pin.conversation or slot.busy:
+                return None
+            return pin
+        return None
+
+    def _assign(self) -> _Pin:
+        replica = pick_replica(self.replicas)
+        conversation = next(self._conversations)
+
+        free = [(i, s) for i, s in enumerate(self._replica_slots(replica)) if not s.busy]
+        if not free:
+            return _Pin(replica, None, conversation)
+
+        idx, slot = min(free, key=lambda x: x[1].last_used)
+        slot.conversation = conversation
+        return _Pin(replica, idx, conversation)
+
+    def _remember(self, h: str, pin: _Pin) -> None:
+        self._prefixes[h] = pin
+        self._prefixes.move_to_end(h)
+        while len(self._prefixes) > self._max_prefixes:
+            self._prefixes.popitem(last=False)
+
+    @contextmanager
+    def route(self, messages: Sequence[BaseModel]) -> Iterator[SlotRoute]:
+        hashes = prefix_hashes(messages)
+
+        pin = self._lookup(hashes)
+        hit = pin is not None
+        if pin is None:
+            self._misses += 1
+            pin = self._assign()
+        else:
+            self._hits += 1
+
+        if hashes:
+            self._remember(hashes[-1], pin)
+
+        slot = self._replica_slots(pin.replica)[pin.slot] if pin.slot is not None else None
+        if slot is not None:
+            slot.busy += 1
+
+        try:
+            with pin.replica.lease():
+                yield SlotRoute(replica=pin.replica, slot=pin.slot, hit=hit)
+        finally:
+            if slot is not None:
+                slot.busy -= 1
+                slot.last_used = time.monotonic()
+
+    def stats(self) -> AffinityStats:
+        return AffinityStats(
+            name=self.name,
+            prefixes=len(self._prefixes),
+            hits=self._hits,
+            misses=self._misses,
+            slots_pinned=sum(1 for slots in self._slots.values() for s in slots if s.conversation >= 0),
+        )
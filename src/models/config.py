@@ -2,8 +2,9 @@ import yaml
 
 from typing import List, Dict, Any
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, Field, ValidationError
 
+from core.executors import ExecutorParams
 from core.globals import YAML_CONFIG
 from models.definitions import (
     ModelConfigAny, MODEL_CONFIG_CLASSES,
@@ -32,6 +33,7 @@ def validate_model_from_config(data: Dict[str, Any]) -> ModelConfigAny:
 
 class Config(BaseModel):
     models: List[ModelConfigAny]
+    executors: ExecutorParams = Field(default_factory=ExecutorParams)
 
     @classmethod
     def read_yaml(cls) -> "Config":
@@ -56,7 +58,8 @@ class Config(BaseModel):
             models=[
                 validate_model_from_config(model_data)
                 for model_data in models
-            ]
+            ],
+            executors=ExecutorParams.model_validate(data.get("executors") or {}),
         )
 
 
@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from threading import Lock
+from typing import List, Iterator, Optional
+
+from pydantic import BaseModel, PrivateAttr, Field
+
+from models.status import Status
+
+
+class NoReplicaAvailable(Exception):
+    pass
+
+
+class Replica(BaseModel):
+    address: str # container host for gRPC backends, base url for HTTP backends
+    status: Status = Field(default_factory=Status)
+    slots: Optional[int] = None # llama.cpp server slots, learned from /props by the status worker
+
+    _in_flight: int = PrivateAttr(default=0)
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def _acquire(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    @contextmanager
+    def lease(self) -> Iterator["Replica"]:
+        self._acquire()
+        try:
+            yield self
+        finally:
+            self._release()
+
+
+def replicas_status(replicas: List[Replica]) -> Status:
+    """
+    Model-level status: the first running replica, otherwise the first replica
+    """
+    return next((r.status for r in replicas if r.status.running), replicas[0].status)
+
+
+def pick_replica(replicas: List[Replica]) -> Replica:
+    """
+    Least outstanding requests among running replicas
+    """
+    running = [r for r in replicas if r.status.running]
+    if not running:
+        raise NoReplicaAvailable(f"No running replicas among: {', '.join(r.address for r in replicas)}")
+    return min(running, key=lambda r: r.in_flight)
+
+
+@contextmanager
+def lease_replica(replicas: List[Replica]) -> Iterator[Replica]:
+    replica = pick_replica(replicas)
+    with replica.lease():
+        yield replica
+
+
+class ReplicaLease:
+    """
+    The least loaded running replica, counted in flight from the pick until release;
+    for requests that pick their replica at admission and use it over a whole response
+    """
+    def __init__(self, replicas: List[Replica]):
+        self.replica = pick_replica(replicas)
+        self.replica._acquire()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.replica._release()
+
+
+@contextmanager
+def leased(replica: Replica | ReplicaLease) -> Iterator[Replica]:
+    """
+    Leases a bare replica for the block; a ReplicaLease is already counted by its holder
+    """
+    if isinstance(replica, ReplicaLease):
+        yield replica.replica
+        return
+    with replica.lease():
+        yield replica
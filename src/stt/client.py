@@ -3,8 +3,9 @@ from typing import AsyncGenerator, Tuple
 
 import betterproto
 from grpclib import GRPCError
-from grpclib.client import Channel
+from grpclib.exceptions import StreamTerminatedError
 
+from core.grpc import ChannelPool, is_connection_lost
 from core.logger import error
 from generated.stt_service import (
     ProtoTranscribeStub,
@@ -12,39 +13,45 @@ from generated.stt_service import (
     TranscribeStreamingConfig,
     PingRequest,
 
-    SpeechStart, SpeechStop, SpeechTranscription
+    SpeechStart, SpeechStop, SpeechTranscription, SpeechPartial
 )
+from models.replicas import Replica, ReplicaLease, leased
 from stt.globals import GRPC_PORT
 
 
-async def ping_stt(host: str) -> Tuple[bool, str | None]:
-    async with Channel(host, GRPC_PORT) as channel:
-        stub = ProtoTranscribeStub(channel)
+async def ping_stt(channels: ChannelPool, host: str) -> Tuple[bool, str | None]:
+    channel = channels.get(host, GRPC_PORT)
+    stub = ProtoTranscribeStub(channel)
 
-        try:
-            response = await asyncio.wait_for(
-                stub.ping(PingRequest()),
-                timeout=1.0
-            )
-            return response.status == "ok", None
+    try:
+        response = await asyncio.wait_for(
+            stub.ping(PingRequest()),
+            timeout=1.0
+        )
+        return response.status == "ok", None
+
+    except Exception as e:
+        channels.discard(host, GRPC_PORT, channel)
+        return False, f"ping failed: {str(e)}"
 
-        except Exception as e:
-            return False, f"ping failed: {str(e)}"
-        
 
 async def stream_transcriptions(
-        host: str,
+        channels: ChannelPool,
+        replica: Replica | ReplicaLease,
         model: str,
         bytes_stream: AsyncGenerator[bytes, None],
-) -> AsyncGenerator[SpeechStart | SpeechStop | SpeechTranscription, None]:
+        offline: bool = False,
+        partials: bool = False,
+) -> AsyncGenerator[SpeechStart | SpeechStop | SpeechTranscription | SpeechPartial, None]:
     async def generate_requests() -> AsyncGenerator[TranscribePost, None]:
-        config_msg = TranscribeStreamingConfig(model=model)
+        config_msg = TranscribeStreamingConfig(model=model, offline=offline, partials=partials)
         yield TranscribePost(config=config_msg)
 
         async for chunk in bytes_stream:
             yield TranscribePost(audio=chunk)
 
-    async with Channel(host, GRPC_PORT) as channel:
+    with leased(replica) as replica_, channels.stream(replica_.address, GRPC_PORT) as channel:
+        host = replica_.address
         stub = ProtoTranscribeStub(channel)
 
         response_stream = stub.transcribe(generate_requests(), timeout=None)
@@ -64,6 +71,10 @@ async def stream_transcriptions(
                     assert value is not None
                     yield value
 
+                elif field == "speech_partial":
+                    assert value is not None
+                    yield value
+
                 else:
                     continue
 
@@ -71,3 +82,10 @@ async def stream_transcriptions(
             err = f"failed to stream_transcriptions: {str(e)}"
             error(err)
             raise e
+
+        except (ConnectionError, StreamTerminatedError) as e:
+            if is_connection_lost(e):
+                channels.discard(host, GRPC_PORT, channel)
+            err = f"failed to stream_transcriptions, stream terminated: {str(e)}"
+            error(err)
+            raise e
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class AudioRing:
+    """
+    Float32 samples addressed by absolute stream position. Only samples from `floor` on are retained;
+    the buffer doubles when that span does not fit and shrinks back once it is small again.
+    """
+    def __init__(self, capacity: int):
+        self._initial = max(1, capacity)
+        self._buf = np.zeros(self._initial, dtype=np.float32)
+        self.written = 0 # position of the next sample
+        self.floor = 0 # oldest retained position
+
+    def __len__(self) -> int:
+        return self.written - self.floor
+
+    def _resize(self, capacity: int) -> None:
+        data = self.read(self.floor, self.written)
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._place(self.floor, data)
+
+    def _place(self, pos: int, x: np.ndarray) -> None:
+        cap = len(self._buf)
+        i = pos % cap
+        first = min(len(x), cap - i)
+        self._buf[i:i + first] = x[:first]
+        self._buf[:len(x) - first] = x[first:]
+
+    def write(self, x: np.ndarray) -> None:
+        need = self.written + len(x) - self.floor
+        if need > len(self._buf):
+            capacity = len(self._buf)
+            while capacity < need:
+                capacity *= 2
+            self._resize(capacity)
+
+        self._place(self.written, x)
+        self.written += len(x)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        assert self.floor <= start <= end <= self.written, f"[{start}, {end}) is not retained"
+
+        cap = len(self._buf)
+        i = start % cap
+        n = end - start
+        if i + n <= cap:
+            return self._buf[i:i + n].copy()
+        return np.concatenate([self._buf[i:], self._buf[:n - (cap - i)]])
+
+    def release(self, pos: int) -> None:
+        """
+        Drops samples before pos
+        """
+        self.floor = max(self.floor, min(pos, self.written))
+        if len(self._buf) > self._initial and len(self) <= self._initial // 2:
+            self._resize(self._initial)
@@ -0,0 +1,195 @@
+import asyncio
+import time
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, List, Optional
+
+import numpy as np
+
+from core.executors import get_executor
+from core.logger import error, info
+from stt.inference.vad import (
+    CONTEXT_SIZE, RMS_THRESHOLD, SileroState,
+    silero_session, silero_step
+)
+from stt.models.model_config import BatchingParams
+
+
+@dataclass
+class _Pending:
+    audio: np.ndarray
+    future: asyncio.Future
+
+
+class RecognizeBatcher:
+    """
+    Recognizes utterances of all concurrent streams with shared model.recognize calls.
+    The first pending utterance waits at most max_wait_ms for others to join; a full batch goes out at once.
+    One batch runs at a time, the next one fills up meanwhile. Lives on the server event loop.
+    """
+    def __init__(self, model: Any, params: BatchingParams):
+        self._model = model
+        self._max_batch_size = params.max_batch_size
+        self._max_wait = params.max_wait_ms / 1000
+
+        self._pending: Deque[_Pending] = deque()
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def recognize(self, audio: np.ndarray) -> Any:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_Pending(audio, future))
+        self._wakeup.set()
+        if len(self._pending) >= self._max_batch_size:
+            self._full.set()
+
+        return await future
+
+    def _take_batch(self) -> List[_Pending]:
+        batch = []
+        while self._pending and len(batch) < self._max_batch_size:
+            item = self._pending.popleft()
+            if not item.future.done(): # the stream went away while waiting
+                batch.append(item)
+        if len(self._pending) < self._max_batch_size:
+            self._full.clear()
+        if not self._pending:
+            self._wakeup.clear()
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < self._max_batch_size and self._max_wait > 0:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self._max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._take_batch()
+            if not batch:
+                continue
+
+            try:
+                t0 = time.time()
+                results = await loop.run_in_executor(get_executor("inference"), self._model.recognize, [p.audio for p in batch])
+                info(f"Inference of {len(batch)} utterances took {time.time() - t0:.2f} seconds")
+
+            except Exception as e:
+                error(f"Batched inference failed: {e}")
+                for p in batch:
+                    if not p.future.done():
+                        p.future.set_exception(e)
+                continue
+
+            for p, result in zip(batch, results):
+                if not p.future.done():
+                    p.future.set_result(result)
+
+
+@dataclass
+class _PendingFrames:
+    stream: SileroState
+    frames: np.ndarray # (n, FRAME_SIZE)
+    future: asyncio.Future
+
+
+class VadBatcher:
+    """
+    Silero VAD shared by all streams of the server. Frames waiting from every stream are scored together:
+    each ONNX run advances all of them by one frame, with every stream's recurrent state carried separately.
+    Runs in the executor, one batch at a time. Lives on the server event loop.
+    """
+    def __init__(self, vad_model: Any, sample_rate: int = 16000, max_batch_size: int = 64):
+        self._session = silero_session(vad_model)
+        self._sample_rate = sample_rate
+        self._max_batch_size = max_batch_size
+
+        if self._session is None:
+            error("VAD model exposes no ONNX session, using energy threshold")
+
+        self._pending: Deque[_PendingFrames] = deque()
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def new_stream() -> SileroState:
+        return SileroState.new()
+
+    async def speech_probs(self, stream: SileroState, frames: np.ndarray) -> np.ndarray:
+        """
+        Speech probability of each frame; a stream must not have two calls in flight
+        """
+        if len(frames) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingFrames(stream, frames, future))
+        self._wakeup.set()
+        return await future
+
+    @staticmethod
+    def _energy(batch: List[_PendingFrames]) -> List[np.ndarray]:
+        return [
+            (np.sqrt(np.mean(p.frames ** 2, axis=1)) > RMS_THRESHOLD).astype(np.float32)
+            for p in batch
+        ]
+
+    def _score(self, batch: List[_PendingFrames]) -> List[np.ndarray]:
+        if self._session is None:
+            return self._energy(batch)
+
+        lengths = np.array([len(p.frames) for p in batch])
+        state = np.stack([p.stream.state for p in batch], axis=1)
+        context = np.stack([p.stream.context for p in batch])
+        probs = [np.empty(n, dtype=np.float32) for n in lengths]
+
+        try:
+            for t in range(int(lengths.max())):
+                active = np.flatnonzero(lengths > t)
+                frames = np.stack([batch[i].frames[t] for i in active])
+
+                out, state[:, active] = silero_step(self._session, frames, state[:, active], context[active], self._sample_rate)
+                context[active] = frames[:, -CONTEXT_SIZE:]
+                for k, i in enumerate(active):
+                    probs[i][t] = out[k]
+
+        except Exception as e:
+            error(f"Batched VAD failed, using energy threshold: {e}")
+            return self._energy(batch)
+
+        for i, p in enumerate(batch):
+            p.stream.state = state[:, i].copy()
+            p.stream.context = context[i].copy()
+        return probs
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._wakeup.wait()
+
+            batch = []
+            while self._pending and len(batch) < self._max_batch_size:
+                item = self._pending.popleft()
+                if not item.future.done():
+                    batch.append(item)
+            if not self._pending:
+                self._wakeup.clear()
+            if not batch:
+                continue
+
+            results = await loop.run_in_executor(get_executor("vad"), self._score, batch)
+            for p, probs in zip(batch, results):
+                if not p.future.done():
+                    p.future.set_result(probs)
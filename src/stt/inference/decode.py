@@ -0,0 +1,134 @@
+import asyncio
+
+from typing import AsyncGenerator, BinaryIO, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from fastapi import UploadFile
+
+from core.executors import get_executor
+from core.ffmpeg import FfmpegPool
+from core.logger import warn
+from stt.inference.ffmpeg import READ_SIZE
+from stt.inference.ffmpeg_utils import get_pcm_stream, file_to_stream
+
+
+TARGET_SAMPLE_RATE = 16000
+BLOCK_SECONDS = 10.
+
+
+def sniff_container(head: bytes) -> Optional[str]:
+    """
+    Containers soundfile decodes in-process; everything else (mp3, ogg, opus) goes through ffmpeg
+    """
+    if head[:4] in (b"RIFF", b"RF64") and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    return None
+
+
+class Resampler:
+    """
+    Streaming band-limited resampler: windowed-sinc taps looked up from a polyphase table,
+    evaluated for a whole block of output samples at once.
+    The cutoff follows the lower of both Nyquist frequencies, so downsampling does not alias.
+    """
+    PHASES = 256
+    BLOCK = 65536 # output samples per vectorized step
+
+    def __init__(self, sr_in: int, sr_out: int, zero_crossings: int = 8):
+        self.step = sr_in / sr_out
+
+        cutoff = min(1., sr_out / sr_in) * 0.95
+        self.half_width = int(np.ceil(zero_crossings / cutoff))
+
+        self.offsets = np.arange(-self.half_width + 1, self.half_width + 1)
+        frac = np.arange(self.PHASES + 1)[:, None] / self.PHASES
+        d = self.offsets[None, :] - frac
+        window = np.where(np.abs(d) < self.half_width, 0.5 + 0.5 * np.cos(np.pi * d / self.half_width), 0.)
+        table = cutoff * np.sinc(cutoff * d) * window
+        self.table = (table / table.sum(axis=1, keepdims=True)).astype(np.float32)
+
+        self.buf = np.zeros(self.half_width, dtype=np.float32) # left context before the first sample
+        self.buf_start = -self.half_width # absolute input index of buf[0]
+        self.n_out = 0
+
+    def process(self, x: np.ndarray, final: bool = False) -> np.ndarray:
+        self.buf = np.concatenate([self.buf, x.astype(np.float32, copy=False)])
+        end = self.buf_start + len(self.buf)
+
+        if final:
+            n_total = int(np.ceil(end / self.step))
+            self.buf = np.concatenate([self.buf, np.zeros(self.half_width, dtype=np.float32)])
+        else:
+            # every tap of an output sample must already be buffered
+            n_total = max(self.n_out, int(np.ceil((end - self.half_width) / self.step)))
+
+        outputs = []
+        for start in range(self.n_out, n_total, self.BLOCK):
+            t = np.arange(start, min(start + self.BLOCK, n_total)) * self.step
+            base = np.floor(t).astype(np.int64)
+            phase = np.rint((t - base) * self.PHASES).astype(np.int64)
+
+            taps = self.buf[(base - self.buf_start)[:, None] + self.offsets[None, :]]
+            outputs.append(np.einsum("ij,ij->i", taps, self.table[phase]))
+
+        self.n_out = n_total
+
+        keep_from = int(np.floor(self.n_out * self.step)) - self.half_width + 1
+        drop = min(max(0, keep_from - self.buf_start), len(self.buf))
+        self.buf = self.buf[drop:]
+        self.buf_start += drop
+
+        return np.concatenate(outputs) if outputs else np.zeros(0, dtype=np.float32)
+
+
+async def soundfile_pcm_stream(fileobj: BinaryIO) -> AsyncGenerator[bytes, None]:
+    """
+    16 kHz mono float32 PCM, decoded block by block in the executor
+    """
+    loop = asyncio.get_running_loop()
+
+    with sf.SoundFile(fileobj) as f:
+        resampler = Resampler(f.samplerate, TARGET_SAMPLE_RATE) if f.samplerate != TARGET_SAMPLE_RATE else None
+        block = int(f.samplerate * BLOCK_SECONDS)
+
+        def next_block() -> Tuple[bytes, bool]:
+            data = f.read(block, dtype="float32", always_2d=True)
+            final = len(data) < block
+            mono = data.mean(axis=1, dtype=np.float32) if data.shape[1] > 1 else data[:, 0]
+            if resampler is not None:
+                mono = resampler.process(mono, final=final)
+            return mono.tobytes(), final
+
+        while True:
+            pcm, final = await loop.run_in_executor(get_executor("decode"), next_block)
+            for i in range(0, len(pcm), READ_SIZE):
+                yield pcm[i:i + READ_SIZE]
+            if final:
+                break
+
+
+async def get_upload_pcm_stream(file: UploadFile, ffmpeg_pool: FfmpegPool) -> AsyncGenerator[bytes, None]:
+    """
+    WAV and FLAC are decoded in-process, other containers fall back to an ffmpeg decoder
+    """
+    await file.seek(0)
+    head = await file.read(12)
+    await file.seek(0)
+
+    if sniff_container(head) is not None:
+        try:
+            sf.info(file.file)
+        except (sf.LibsndfileError, RuntimeError) as e:
+            warn(f"in-process decode of {file.filename} failed, falling back to ffmpeg: {e}")
+        else:
+            file.file.seek(0)
+            async for chunk in soundfile_pcm_stream(file.file):
+                yield chunk
+            return
+
+    async for chunk in get_pcm_stream(file_to_stream(file), ffmpeg_pool):
+        yield chunk
@@ -1,17 +1,29 @@
 import asyncio
 
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Optional, List
+
+from core.ffmpeg import FfmpegPool
+
+
+READ_SIZE = 65_536 # 16384 float32 samples @ 16kHz, about 1s of audio
 
 
 class FfmpegDecoder:
     def __init__(
             self,
             input_stream: AsyncGenerator[bytes, None],
+            pool: FfmpegPool,
     ):
         self.input_stream = input_stream
+        self.pool = pool
+        self._cmd: List[str] = []
         self._proc: Optional[asyncio.subprocess.Process] = None
         self._feeder_task: Optional[asyncio.Task] = None
 
+    @staticmethod
+    def _name() -> str:
+        return "decode 16000Hz 1ch"
+
     async def _feed_stdin(self):
         assert self._proc is not None
         assert self._proc.stdin is not None
@@ -32,7 +44,7 @@ class FfmpegDecoder:
 
     async def __aenter__(self):
         cmd = [
-            "ffmpeg",
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
             "-i", "pipe:0",
             "-f", "f32le",
             "-ac", "1",
@@ -41,12 +53,8 @@ class FfmpegDecoder:
             "pipe:1"
         ]
 
-        self._proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        self._cmd = cmd
+        self._proc = await self.pool.acquire(self._name(), cmd)
 
         if not self._proc.stdin or not self._proc.stdout:
             raise RuntimeError("Failed to open ffmpeg pipes")
@@ -63,16 +71,8 @@ class FfmpegDecoder:
             except asyncio.CancelledError:
                 pass
 
-        if self._proc and self._proc.returncode is None:
-            try:
-                self._proc.terminate()
-                try:
-                    await asyncio.wait_for(self._proc.wait(), timeout=2.0)
-                except asyncio.TimeoutError:
-                    self._proc.kill()
-                    await self._proc.wait()
-            except ProcessLookupError:
-                pass
+        if self._proc:
+            await self.pool.release(self._cmd, self._proc)
 
     def __aiter__(self):
         return self
@@ -87,8 +87,7 @@ class FfmpegDecoder:
             except Exception as e:
                 raise RuntimeError(f"Input stream failed: {e}") from e
 
-        # Read 4096 bytes (2048 samples @ 16-bit) -> approx 128ms of audio
-        data = await self._proc.stdout.read(4096)
+        data = await self._proc.stdout.read(READ_SIZE)
 
         if data:
             return data
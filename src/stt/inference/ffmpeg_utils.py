@@ -2,6 +2,7 @@ from typing import AsyncGenerator
 
 from fastapi import UploadFile
 
+from core.ffmpeg import FfmpegPool
 from stt.inference.ffmpeg import FfmpegDecoder
 
 
@@ -14,9 +15,13 @@ async def file_to_stream(file: UploadFile, chunk_size: int = 4096) -> AsyncGener
         yield chunk
 
 
-async def get_pcm_stream(file_stream: AsyncGenerator[bytes, None]) -> AsyncGenerator[bytes, None]:
+async def get_pcm_stream(
+        file_stream: AsyncGenerator[bytes, None],
+        ffmpeg_pool: FfmpegPool,
+) -> AsyncGenerator[bytes, None]:
     async with FfmpegDecoder(
         input_stream=file_stream,
+        pool=ffmpeg_pool,
     ) as stream:
         async for chunk in stream:
             yield chunk
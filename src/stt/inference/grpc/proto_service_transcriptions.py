@@ -16,8 +16,10 @@ from generated.stt_service import (
 )
 
 from models.definitions import ModelSTTAny
-from stt.inference.schemas import SpeechStop, SpeechStart, SpeechTranscription
+from stt.inference.schemas import ParakeetEvent, SpeechStop, SpeechStart, SpeechTranscription, SpeechPartial
 
+from stt.inference.batching import RecognizeBatcher, VadBatcher
+from stt.inference.offline_parakeet import transcribe_parakeet_offline
 from stt.inference.streaming_parakeet import stream_parakeet_with_vad
 from stt.models import ModelRecordParakeet
 
@@ -40,6 +42,9 @@ class ProtoTranscriptionService(ProtoTranscribeBase):
         self.model = model
         assert isinstance(self.model.record, ModelRecordParakeet) # todo: remove when >1 model
 
+        self.recognizer = RecognizeBatcher(parakeet_model, model.config.batching)
+        self.vad = VadBatcher(vad_model)
+
     async def transcribe(
             self,
             transcribe_post_iterator: AsyncIterator[TranscribePost]
@@ -56,6 +61,9 @@ class ProtoTranscriptionService(ProtoTranscribeBase):
             warn(err)
             raise GRPCError(Status.FAILED_PRECONDITION, err)
 
+        # set when the client goes away mid-stream: the audio so far is not a complete input, nobody awaits its transcript
+        stream_terminated = asyncio.Event()
+
         async def bytes_generator() -> AsyncIterator[np.ndarray]:
             SAMPLE_RATE = 16000
             BYTES_PER_SAMPLE = 4
@@ -77,15 +85,35 @@ class ProtoTranscriptionService(ProtoTranscribeBase):
                 if len(buffer) > 0:
                     yield np.frombuffer(buffer, dtype=np.float32)
 
-            except (asyncio.CancelledError, StreamTerminatedError):
+            except StreamTerminatedError:
+                stream_terminated.set()
+                return
+
+        async def offline_streamer() -> AsyncIterator[ParakeetEvent]:
+            chunks = [chunk async for chunk in bytes_generator()]
+            if not chunks or stream_terminated.is_set():
                 return
 
-        streamer = stream_parakeet_with_vad(
-            loop=self.loop,
-            audio_stream=bytes_generator(),
-            model=self.parakeet_model,
-            vad_model=self.vad_model,
-        )
+            async for event in transcribe_parakeet_offline(
+                loop=self.loop,
+                signal=np.concatenate(chunks),
+                model=self.parakeet_model,
+                vad_model=self.vad_model,
+            ):
+                yield event
+
+        if config.offline:
+            streamer = offline_streamer()
+        else:
+            streamer = stream_parakeet_with_vad(
+                audio_stream=bytes_generator(),
+                recognizer=self.recognizer,
+                vad=self.vad,
+                pre_roll_duration=self.model.config.pre_roll,
+                partial_interval=self.model.config.partial_interval if config.partials else None,
+                partial_window=self.model.config.partial_window,
+                cancelled=stream_terminated,
+            )
 
         try:
             async for event in streamer:
@@ -97,6 +125,8 @@ class ProtoTranscriptionService(ProtoTranscribeBase):
                     response = TranscribeResp(speech_stop=event.to_proto())
                 elif isinstance(event, SpeechTranscription):
                     response = TranscribeResp(speech_transcription=event.to_proto())
+                elif isinstance(event, SpeechPartial):
+                    response = TranscribeResp(speech_partial=event.to_proto())
 
                 if response:
                     try:
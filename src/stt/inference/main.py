@@ -4,6 +4,7 @@ import onnx_asr
 import uvloop
 
 from core import BASE_DIR
+from core.executors import configure_executors
 from core.logger import init_logger, info
 from models.config import Config, models_from_config
 from models.definitions import ModelSTTAny
@@ -54,6 +55,7 @@ def main():
     info("Logger initialized")
 
     config = Config.read_yaml()
+    configure_executors(config.executors)
     models = models_from_config(config)
 
     models = [m for m in models if isinstance(m, ModelSTTAny)]
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from typing import Any, AsyncGenerator, Dict, List
+
+import numpy as np
+
+from core.executors import get_executor
+from core.logger import error, info
+from stt.inference.schemas import SpeechTranscription, recognized_text
+from stt.inference.vad import Segment, frame_speech, speech_segments
+
+
+MAX_BATCH_SIZE = 16
+MAX_BATCH_SECONDS = 480. # padded audio per recognize call
+
+
+def _batches(segments: List[Segment], sample_rate: int) -> List[List[int]]:
+    """
+    Segment indices grouped by similar length, so a batch is not dominated by padding
+    """
+    order = sorted(range(len(segments)), key=lambda i: segments[i].end - segments[i].start)
+    max_samples = int(MAX_BATCH_SECONDS * sample_rate)
+
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in order:
+        longest = segments[i].end - segments[i].start # sorted ascending: the newest is the longest
+        if current and (len(current) >= MAX_BATCH_SIZE or longest * (len(current) + 1) > max_samples):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def transcribe_parakeet_offline(
+        loop: asyncio.AbstractEventLoop,
+        signal: np.ndarray,
+        model: Any,
+        vad_model: Any,
+        sample_rate: int = 16000,
+) -> AsyncGenerator[SpeechTranscription, None]:
+    """
+    Whole-file transcription: one VAD pass over the full signal, then batched recognize calls over its segments.
+    Transcriptions are yielded in signal order with their offsets.
+    """
+    t0 = time.time()
+    is_speech = await loop.run_in_executor(get_executor("vad"), frame_speech, vad_model, signal, sample_rate)
+    segments = speech_segments(signal, is_speech, sample_rate)
+    info(f"Offline VAD: {len(segments)} segments in {len(signal) / sample_rate:.1f}s of audio, took {time.time() - t0:.2f} seconds")
+
+    texts: Dict[int, str] = {}
+    next_idx = 0
+
+    for batch in _batches(segments, sample_rate):
+        waveforms = [signal[segments[i].start:segments[i].end] for i in batch]
+        try:
+            t0 = time.time()
+            results = await loop.run_in_executor(get_executor("inference"), model.recognize, waveforms)
+            info(f"Batched inference of {len(batch)} segments took {time.time() - t0:.2f} seconds")
+            for i, result in zip(batch, results):
+                texts[i] = recognized_text(result)
+
+        except Exception as e:
+            error(f"Batched inference failed: {e}")
+            for i in batch:
+                texts[i] = ""
+
+        while next_idx in texts:
+            text = texts.pop(next_idx)
+            segment = segments[next_idx]
+            next_idx += 1
+            if text:
+                yield SpeechTranscription(
+                    text=text,
+                    start=segment.start / sample_rate,
+                    end=segment.end / sample_rate,
+                )
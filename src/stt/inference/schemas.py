@@ -1,6 +1,6 @@
 import time
 from dataclasses import dataclass
-from typing import Union
+from typing import Any, Optional, Union
 
 from generated import stt_service
 
@@ -24,12 +24,35 @@ class SpeechStop:
 @dataclass
 class SpeechTranscription:
     text: str
+    start: Optional[float] = None
+    end: Optional[float] = None
 
     def to_proto(self):
         return stt_service.SpeechTranscription(
             text=self.text,
             timestamp=time.time(),
+            start=self.start or 0.,
+            end=self.end or 0.,
         )
 
 
-ParakeetEvent = Union[SpeechStart, SpeechStop, SpeechTranscription]
+@dataclass
+class SpeechPartial:
+    text: str
+
+    def to_proto(self):
+        return stt_service.SpeechPartial(
+            text=self.text,
+            timestamp=time.time(),
+        )
+
+
+def recognized_text(result: Any) -> str:
+    if isinstance(result, str):
+        return result.strip()
+    if hasattr(result, 'text') and result.text:
+        return result.text.strip()
+    return ""
+
+
+ParakeetEvent = Union[SpeechStart, SpeechStop, SpeechTranscription, SpeechPartial]
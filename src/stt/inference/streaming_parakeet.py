@@ -1,148 +1,151 @@
 import asyncio
 import time
 
-from typing import AsyncIterator, AsyncGenerator, Any
+from typing import AsyncIterator, AsyncGenerator, Optional
 
 import numpy as np
 
 from core.logger import error, info
-from stt.inference.schemas import ParakeetEvent, SpeechStart, SpeechStop, SpeechTranscription
+from stt.inference.audio_ring import AudioRing
+from stt.inference.batching import RecognizeBatcher, VadBatcher
+from stt.inference.schemas import (
+    ParakeetEvent, SpeechStart, SpeechStop, SpeechTranscription, SpeechPartial,
+    recognized_text
+)
+from stt.inference.vad import FRAME_SIZE, SPEECH_THRESHOLD
 
 
-def _check_silero_speech(vad_model: Any, chunk: np.ndarray, sample_rate: int) -> bool:
-    try:
-        out = vad_model(chunk, sample_rate)
-        if hasattr(out, 'item'):
-            prob = out.item()
-        else:
-            prob = out
-        return prob > 0.5
-    except Exception:
-        rms = np.sqrt(np.mean(chunk ** 2))
-        return rms > 0.01
+async def _recognize(recognizer: RecognizeBatcher, audio: np.ndarray, sample_rate: int) -> str:
+    t0 = time.time()
+    result = await recognizer.recognize(audio)
+    info(f"Inference of {len(audio) / sample_rate:.2f}s took {time.time() - t0:.2f} seconds")
+    return recognized_text(result)
 
 
 async def stream_parakeet_with_vad(
-        loop: asyncio.AbstractEventLoop,
         audio_stream: AsyncIterator[np.ndarray],
-        model: Any,
-        vad_model: Any,
+        recognizer: RecognizeBatcher,
+        vad: VadBatcher,
         sample_rate: int = 16000,
         min_silence_duration: float = 0.3,
         max_duration: float = 180.0,
+        pre_roll_duration: float = 0.3,
+        post_roll_duration: float = 0.1,
+        partial_interval: Optional[float] = None,
+        partial_window: float = 15.0,
+        cancelled: Optional[asyncio.Event] = None,
 ) -> AsyncGenerator[ParakeetEvent, None]:
-    buffer = []
-    buffer_duration = 0.0
-
-    is_speech_active = False
-    silence_counter = 0.0
-
-    vad_chunk_size = 512
-    vad_buffer = np.array([], dtype=np.float32)
-
-    async for chunk in audio_stream:
-        buffer.append(chunk)
-
-        chunk_duration = len(chunk) / sample_rate
-        buffer_duration += chunk_duration
-
-        vad_buffer = np.concatenate([vad_buffer, chunk])
+    """
+    Audio is retained only from pre_roll_duration before detected speech, so recognize sees the utterance alone
+    and an idle stream holds no more than the pre-roll.
+    With partial_interval set, the utterance so far (its last partial_window seconds) is re-recognized in the background
+    after every partial_interval seconds of new audio; one interim recognition runs at a time.
+    A set `cancelled` event when the audio stream ends skips recognition of the unfinished utterance.
+    """
+    pre_roll = int(pre_roll_duration * sample_rate)
+    post_roll = int(post_roll_duration * sample_rate)
+    max_samples = int(max_duration * sample_rate)
+    min_silence_frames = int(np.ceil(min_silence_duration * sample_rate / FRAME_SIZE))
+
+    ring = AudioRing(pre_roll + 4 * sample_rate)
+    vad_stream = vad.new_stream()
+    vad_pos = 0 # next sample to be scored
+
+    utterance_start: Optional[int] = None # set while speech is active
+    speech_end = 0 # end of the last speech frame
+    silence_frames = 0
+
+    partial_samples = int(partial_interval * sample_rate) if partial_interval else None
+    window_samples = int(partial_window * sample_rate)
+    partial_task: Optional[asyncio.Task] = None
+    partial_pos = 0 # where the audio of the last interim recognition ended
 
-        while len(vad_buffer) >= vad_chunk_size:
-            process_chunk = vad_buffer[:vad_chunk_size]
-            vad_buffer = vad_buffer[vad_chunk_size:]
-
-            is_speech = _check_silero_speech(vad_model, process_chunk, sample_rate)
+    try:
+        async for chunk in audio_stream:
+            ring.write(chunk)
 
-            if is_speech:
-                if not is_speech_active:
-                    yield SpeechStart()
+            n_frames = (ring.written - vad_pos) // FRAME_SIZE
+            frames = ring.read(vad_pos, vad_pos + n_frames * FRAME_SIZE).reshape(n_frames, FRAME_SIZE)
+            probs = await vad.speech_probs(vad_stream, frames)
 
-                is_speech_active = True
-                silence_counter = 0.0
-            else:
-                if is_speech_active:
-                    chunk_duration_vad = vad_chunk_size / sample_rate
-                    silence_counter += chunk_duration_vad
+            for prob in probs:
+                frame_start = vad_pos
+                vad_pos += FRAME_SIZE
 
-        if buffer_duration >= max_duration:
-            if is_speech_active:
-                yield SpeechStop()
+                if prob > SPEECH_THRESHOLD:
+                    if utterance_start is None:
+                        yield SpeechStart()
+                        utterance_start = max(ring.floor, frame_start - pre_roll)
+                        partial_pos = utterance_start
 
-                full_audio = np.concatenate(buffer)
+                    speech_end = vad_pos
+                    silence_frames = 0
 
-                process_audio = full_audio
+                elif utterance_start is not None:
+                    silence_frames += 1
 
+            if partial_task is not None and partial_task.done():
                 try:
-                    t0 = time.time()
-                    result = await loop.run_in_executor(None, model.recognize, process_audio)
-                    info(f"Inference took {time.time() - t0:.2f} seconds")
-
-                    text = ""
-                    if isinstance(result, str):
-                        text = result.strip()
-                    elif hasattr(result, 'text') and result.text:
-                        text = result.text.strip()
-
+                    text = partial_task.result()
                     if text:
-                        yield SpeechTranscription(text=text)
-
+                        yield SpeechPartial(text=text)
                 except Exception as e:
-                    error(f"Inference failed during force flush: {e}")
+                    error(f"Interim inference failed: {e}")
+                partial_task = None
 
-            buffer = []
-            buffer_duration = 0.0
-            is_speech_active = False
-            silence_counter = 0.0
+            if utterance_start is None:
+                ring.release(vad_pos - pre_roll)
+                continue
 
-            continue
+            flush_end = None
+            if vad_pos - utterance_start >= max_samples:
+                flush_end = vad_pos
+            elif silence_frames >= min_silence_frames:
+                flush_end = min(speech_end + post_roll, vad_pos)
 
-        if is_speech_active and silence_counter >= min_silence_duration:
-            yield SpeechStop()
+            if flush_end is None:
+                if partial_samples is not None and partial_task is None and vad_pos - partial_pos >= partial_samples:
+                    audio = ring.read(max(utterance_start, vad_pos - window_samples), vad_pos)
+                    partial_task = asyncio.create_task(_recognize(recognizer, audio, sample_rate))
+                    partial_pos = vad_pos
 
-            full_audio = np.concatenate(buffer)
-            buffer = []
-            buffer_duration = 0.0
-            is_speech_active = False
-            silence_counter = 0.0
+                ring.release(utterance_start)
+                continue
 
-            trim_samples = int((min_silence_duration - 0.1) * sample_rate)
-            if trim_samples > 0 and len(full_audio) > trim_samples:
-                process_audio = full_audio[:-trim_samples]
-            else:
-                process_audio = full_audio
+            yield SpeechStop()
 
-            try:
-                result = await loop.run_in_executor(None, model.recognize, process_audio)
+            if partial_task is not None:
+                partial_task.cancel()
+                partial_task = None
 
-                text = ""
-                if isinstance(result, str):
-                    text = result.strip()
-                elif hasattr(result, 'text') and result.text:
-                    text = result.text.strip()
+            audio = ring.read(utterance_start, flush_end)
+            ring.release(flush_end)
+            utterance_start = None
+            silence_frames = 0
 
+            try:
+                text = await _recognize(recognizer, audio, sample_rate)
                 if text:
                     yield SpeechTranscription(text=text)
 
             except Exception as e:
                 error(f"Inference failed: {e}")
 
-    if buffer and is_speech_active:
-        yield SpeechStop()
-
-        full_audio = np.concatenate(buffer)
+        if utterance_start is not None and not (cancelled is not None and cancelled.is_set()):
+            yield SpeechStop()
 
-        try:
-            result = await loop.run_in_executor(None, model.recognize, full_audio)
+            if partial_task is not None:
+                partial_task.cancel()
+                partial_task = None
 
-            text = ""
-            if isinstance(result, str):
-                text = result.strip()
-            elif hasattr(result, 'text') and result.text:
-                text = result.text.strip()
+            try:
+                text = await _recognize(recognizer, ring.read(utterance_start, ring.written), sample_rate)
+                if text:
+                    yield SpeechTranscription(text=text)
 
-            if text:
-                yield SpeechTranscription(text=text)
+            except Exception as e:
+                error(f"Inference failed during final flush: {e}")
 
-        except Exception as e:
-            error(f"Inference failed during final flush: {e}")
+    finally:
+        if partial_task is not None:
+            partial_task.cancel()
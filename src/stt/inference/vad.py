@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from core.logger import warn
+
+
+FRAME_SIZE = 512
+CONTEXT_SIZE = 64 # samples of the previous frame Silero sees in front of each frame, at 16 kHz
+STATE_SIZE = 128
+SPEECH_THRESHOLD = 0.5
+RMS_THRESHOLD = 0.01
+
+MAX_LANES = 64
+LANE_MIN_FRAMES = 938 # ~30 s; each lane starts from a fresh state
+
+
+@dataclass
+class Segment:
+    start: int # sample offsets into the signal
+    end: int
+
+
+def frame_rms(signal: np.ndarray, frame_size: int = FRAME_SIZE) -> np.ndarray:
+    n_frames = len(signal) // frame_size
+    frames = signal[:n_frames * frame_size].reshape(n_frames, frame_size)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def silero_session(vad_model: Any) -> Optional[Any]:
+    """
+    The ONNX session behind an onnx_asr Silero VAD, None when the model does not expose one
+    """
+    session = getattr(vad_model, "_model", None)
+    return session if hasattr(session, "run") else None
+
+
+@dataclass
+class SileroState:
+    state: np.ndarray # recurrent state, (2, 128)
+    context: np.ndarray # tail of the previous frame, (CONTEXT_SIZE,)
+
+    @classmethod
+    def new(cls) -> "SileroState":
+        return cls(
+            state=np.zeros((2, STATE_SIZE), dtype=np.float32),
+            context=np.zeros(CONTEXT_SIZE, dtype=np.float32),
+        )
+
+
+def silero_step(
+        session: Any,
+        frames: np.ndarray,
+        state: np.ndarray,
+        context: np.ndarray,
+        sample_rate: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One frame of each of B independent streams: frames (B, FRAME_SIZE), state (2, B, 128), context (B, CONTEXT_SIZE).
+    Returns speech probabilities (B,) and the new state.
+    """
+    output, new_state = session.run(
+        ["output", "stateN"],
+        {"input": np.concatenate([context, frames], axis=1), "state": state, "sr": [sample_rate]}
+    )
+    return output[:, 0], new_state
+
+
+def frame_speech(vad_model: Any, signal: np.ndarray, sample_rate: int, frame_size: int = FRAME_SIZE) -> np.ndarray:
+    """
+    Speech flag for every full frame of the signal.
+    The signal is cut into lanes that Silero walks through side by side, one batched run per frame step.
+    Falls back to an energy threshold when no Silero session is available.
+    """
+    n_frames = len(signal) // frame_size
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+
+    frames = signal[:n_frames * frame_size].reshape(n_frames, frame_size)
+
+    session = silero_session(vad_model)
+    if session is not None:
+        try:
+            n_lanes = min(MAX_LANES, max(1, n_frames // LANE_MIN_FRAMES))
+            steps = -(-n_frames // n_lanes)
+            lanes = np.zeros((n_lanes * steps, frame_size), dtype=np.float32)
+            lanes[:n_frames] = frames
+            lanes = lanes.reshape(n_lanes, steps, frame_size)
+
+            state = np.zeros((2, n_lanes, STATE_SIZE), dtype=np.float32)
+            context = np.zeros((n_lanes, CONTEXT_SIZE), dtype=np.float32)
+            probs = np.empty((n_lanes, steps), dtype=np.float32)
+            for t in range(steps):
+                probs[:, t], state = silero_step(session, lanes[:, t], state, context, sample_rate)
+                context = lanes[:, t, -CONTEXT_SIZE:]
+
+            return probs.reshape(-1)[:n_frames] > SPEECH_THRESHOLD
+
+        except Exception as e:
+            warn(f"Silero VAD failed, using energy threshold: {e}")
+
+    return np.sqrt(np.mean(frames ** 2, axis=1)) > RMS_THRESHOLD
+
+
+def speech_segments(
+        signal: np.ndarray,
+        is_speech: np.ndarray,
+        sample_rate: int,
+        frame_size: int = FRAME_SIZE,
+        min_silence_duration: float = 0.3,
+        min_speech_duration: float = 0.1,
+        max_duration: float = 30.0,
+        pad_duration: float = 0.1,
+) -> List[Segment]:
+    """
+    Speech runs of the frame flags: gaps shorter than min_silence_duration are bridged,
+    runs longer than max_duration are cut at their quietest frame.
+    """
+    if not is_speech.any():
+        return []
+
+    flags = np.concatenate([[False], is_speech, [False]]).astype(np.int8)
+    edges = np.diff(flags)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    min_gap = int(np.ceil(min_silence_duration * sample_rate / frame_size))
+    keep = np.concatenate([[True], starts[1:] - ends[:-1] >= min_gap])
+    run_starts = starts[keep]
+    run_ends = np.concatenate([ends[np.flatnonzero(keep)[1:] - 1], ends[-1:]])
+
+    min_frames = int(np.ceil(min_speech_duration * sample_rate / frame_size))
+    long_enough = run_ends - run_starts >= min_frames
+    run_starts, run_ends = run_starts[long_enough], run_ends[long_enough]
+
+    max_frames = max(2, int(max_duration * sample_rate / frame_size))
+    rms = frame_rms(signal, frame_size)
+    pad = int(pad_duration * sample_rate)
+
+    segments = []
+    for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+        while end - start > max_frames:
+            window = rms[start + max_frames // 2:start + max_frames]
+            cut = start + max_frames // 2 + int(np.argmin(window))
+            segments.append(Segment(start, cut))
+            start = cut
+        segments.append(Segment(start, end))
+
+    return [
+        Segment(
+            start=max(0, s.start * frame_size - pad),
+            end=min(len(signal), s.end * frame_size + pad),
+        )
+        for s in segments
+    ]
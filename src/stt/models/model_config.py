@@ -1,6 +1,13 @@
-from typing import Optional, Any, Literal
+from typing import Optional, Any, Literal, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from models.admission import AdmissionParams
+
+
+class BatchingParams(BaseModel):
+    max_batch_size: int = Field(ge=1, le=64, default=8)
+    max_wait_ms: float = Field(ge=0, le=200, default=10.) # how long the first utterance waits for others to join
 
 
 class ModelConfigBase(BaseModel):
@@ -8,9 +15,19 @@ class ModelConfigBase(BaseModel):
     backend: Any
 
     container: str
+    replicas: List[str] = Field(default_factory=list) # additional containers serving the same model
+    admission: AdmissionParams = Field(default_factory=AdmissionParams)
+    batching: BatchingParams = Field(default_factory=BatchingParams) # utterances of concurrent streams recognized together
+    pre_roll: float = Field(ge=0., le=2., default=0.3) # seconds of audio kept in front of detected speech
+    partial_interval: float = Field(ge=0.2, le=10., default=1.0) # seconds of new speech between interim hypotheses
+    partial_window: float = Field(ge=1., le=60., default=15.) # interim hypotheses cover at most this much of the utterance tail
 
     params: Optional[Any] = None
 
+    @property
+    def containers(self) -> List[str]:
+        return [self.container, *self.replicas]
+
 
 class ModelConfigParakeet(ModelConfigBase):
     backend: Literal["parakeet"]
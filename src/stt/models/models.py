@@ -1,5 +1,9 @@
-from pydantic import BaseModel, ConfigDict, Field
+from typing import List
 
+from pydantic import BaseModel, ConfigDict
+
+from models.admission import AdmissionLimiter
+from models.replicas import Replica, replicas_status
 from models.status import Status
 from stt.models import ModelRecordAny, ModelConfigAny
 from stt.models.records import RECORDS
@@ -8,7 +12,12 @@ from stt.models.records import RECORDS
 class ModelBase(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    status: Status = Field(default_factory=Status)
+    replicas: List[Replica]
+    admission: AdmissionLimiter
+
+    @property
+    def status(self) -> Status:
+        return replicas_status(self.replicas)
 
 
 class Model(ModelBase):
@@ -18,6 +27,8 @@ class Model(ModelBase):
     @classmethod
     def new(cls, record: ModelRecordAny, config: ModelConfigAny) -> "Model":
         return cls(
+            replicas=[Replica(address=container) for container in config.containers],
+            admission=AdmissionLimiter(record.resolve_name, config.admission),
             record=record,
             config=config,
         )
@@ -2,6 +2,7 @@ import asyncio
 import soundfile as sf
 from typing import AsyncGenerator, Any
 
+from core.grpc import ChannelPool
 from core.logger import error
 from core.status.models import Task, TaskType
 from models.definitions import ModelSTTAny
@@ -25,54 +26,56 @@ async def async_audio_generator(filename: str, chunk_size: int = 4096) -> AsyncG
 async def task_worker(
         loop: asyncio.AbstractEventLoop,
         _a_session: Any,
+        channels: ChannelPool,
         t0: float,
         task: Task,
 ):
     assert isinstance(task.model, ModelSTTAny)
     assert isinstance(task.model.record, ModelRecordParakeet)
 
-    host = task.model.config.container
+    host = task.replica.address
+    status = task.replica.status
     model_name = task.model.record.model
 
     try:
         if task.task_type == TaskType.ping:
-            is_alive, err = await ping_stt(host)
+            is_alive, err = await ping_stt(channels, host)
 
             if is_alive:
-                task.model.status.ping_ok = True
+                status.ping_ok = True
             else:
                 if loop.time() - t0 > STARTUP_TIME:
-                    task.model.status.ping_ok = False
-                    task.model.status.error = err
-                    error(f"MODEL {model_name}: {err}")
+                    status.ping_ok = False
+                    status.error = err
+                    error(f"MODEL {model_name} @ {host}: {err}")
 
         elif task.task_type == TaskType.request:
             byte_stream = async_audio_generator(str(MOCK_FILE))
             has_response = False
-            async for _response in stream_transcriptions(host, model_name, byte_stream):
+            async for _response in stream_transcriptions(channels, task.replica, model_name, byte_stream):
                 has_response = True
 
             if has_response:
-                task.model.status.request_ok = True
-                if task.model.status.error is not None:
-                    task.model.status.error = None
+                status.request_ok = True
+                if status.error is not None:
+                    status.error = None
             else:
                 if loop.time() - t0 > STARTUP_TIME:
                     err = "REQUEST FAILED: Stream yielded no events"
-                    task.model.status.request_ok = False
-                    task.model.status.error = err
-                    error(f"MODEL {model_name}: {err}")
+                    status.request_ok = False
+                    status.error = err
+                    error(f"MODEL {model_name} @ {host}: {err}")
 
         else:
             raise ValueError(f"Unknown task type: {task.task_type}")
 
     except Exception as e:
         if task.task_type == TaskType.ping:
-            task.model.status.ping_ok = False
+            status.ping_ok = False
         elif task.task_type == TaskType.request:
-            task.model.status.request_ok = False
+            status.request_ok = False
 
         if loop.time() - t0 > STARTUP_TIME:
             err = f"RPC ERROR: {str(e)}"
-            task.model.status.error = err
-            error(f"MODEL {model_name}: {err}")
+            status.error = err
+            error(f"MODEL {model_name} @ {host}: {err}")
@@ -2,41 +2,57 @@ import asyncio
 from typing import AsyncGenerator, Tuple
 
 from grpclib import GRPCError
-from grpclib.client import Channel
+from grpclib.exceptions import StreamTerminatedError
 
+from core.grpc import ChannelPool, is_connection_lost
 from core.logger import error
 from generated.tts_audio import ProtoAudioStub, PingRequest
+from models.replicas import Replica, ReplicaLease, leased
 from tts.globals import GRPC_PORT
+from tts.inference.sample_format import decode_samples
 from tts.inference.schemas import TTSAudioPost
 
 
-async def ping_tts(host: str) -> Tuple[bool, str | None]:
-    async with Channel(host, GRPC_PORT) as channel:
-        stub = ProtoAudioStub(channel)
+async def ping_tts(channels: ChannelPool, host: str) -> Tuple[bool, str | None]:
+    channel = channels.get(host, GRPC_PORT)
+    stub = ProtoAudioStub(channel)
 
-        try:
-            response = await asyncio.wait_for(
-                stub.ping(PingRequest()),
-                timeout=1.0
-            )
-            return response.status == "ok", None
+    try:
+        response = await asyncio.wait_for(
+            stub.ping(PingRequest()),
+            timeout=1.0
+        )
+        return response.status == "ok", None
 
-        except Exception as e:
-            return False, f"ping failed: {str(e)}"
+    except Exception as e:
+        channels.discard(host, GRPC_PORT, channel)
+        return False, f"ping failed: {str(e)}"
 
 
 async def stream_audio(
-        host: str,
+        channels: ChannelPool,
+        replica: Replica | ReplicaLease,
         post: TTSAudioPost
 ) -> AsyncGenerator[bytes, None]:
-    async with Channel(host, GRPC_PORT) as channel:
+    """
+    Float32 PCM, whatever sample format post asks the replica to send it in
+    """
+    with leased(replica) as replica_, channels.stream(replica_.address, GRPC_PORT) as channel:
+        host = replica_.address
         stub = ProtoAudioStub(channel)
 
         try:
             async for audio in stub.stream_audio(post.into_proto()):
-                yield audio.data
+                yield decode_samples(audio.data, post.sample_format)
 
         except GRPCError as e:
             err = f"failed to stream_audio_proto: {str(e)}"
             error(err)
             raise e
+
+        except (ConnectionError, StreamTerminatedError) as e:
+            if is_connection_lost(e):
+                channels.discard(host, GRPC_PORT, channel)
+            err = f"failed to stream_audio_proto, stream terminated: {str(e)}"
+            error(err)
+            raise e
@@ -1,5 +1,6 @@
 from typing import AsyncGenerator, Literal
 
+from core.ffmpeg import FfmpegPool
 from tts.inference.ffmpeg import FfmpegProc, FfmpegParams
 from tts.inference.utils import build_wav_header
 
@@ -8,7 +9,8 @@ async def encode_audio_stream(
         input_stream: AsyncGenerator[bytes, None],
         output_format: Literal["pcm", "wav", "mp3", "ogg"],
         sample_rate: int,
-        channels: int
+        channels: int,
+        ffmpeg_pool: FfmpegPool,
 ) -> AsyncGenerator[bytes, None]:
     if output_format == "pcm":
         async for chunk in input_stream:
@@ -28,6 +30,7 @@ async def encode_audio_stream(
                 sample_rate=sample_rate,
                 channels=channels
             ),
+            pool=ffmpeg_pool,
     ) as stream:
         async for chunk in stream:
             yield chunk
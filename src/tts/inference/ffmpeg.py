@@ -3,6 +3,11 @@ import asyncio
 from typing import AsyncGenerator, List, Optional, Literal
 from pydantic import BaseModel
 
+from core.ffmpeg import FfmpegPool
+
+
+READ_SIZE = 65_536
+
 
 class FfmpegParams(BaseModel):
     output_format: Literal["mp3", "ogg"]
@@ -15,12 +20,18 @@ class FfmpegProc:
             self,
             input_stream: AsyncGenerator[bytes, None],
             params: FfmpegParams,
+            pool: FfmpegPool,
     ):
         self.input_stream = input_stream
         self.params = params
+        self.pool = pool
+        self._cmd: List[str] = []
         self._proc: Optional[asyncio.subprocess.Process] = None
         self._feeder_task: Optional[asyncio.Task] = None
 
+    def _name(self) -> str:
+        return f"encode {self.params.output_format} {self.params.sample_rate}Hz {self.params.channels}ch"
+
     def _get_format_args(self) -> List[str]:
         if self.params.output_format == "mp3":
             return ["-f", "mp3", "-b:a", "128k"]
@@ -49,19 +60,15 @@ class FfmpegProc:
 
     async def __aenter__(self):
         cmd = [
-            "ffmpeg",
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
             "-f", "f32le",
             "-ar", str(self.params.sample_rate),
             "-ac", str(self.params.channels),
             "-i", "pipe:0"
         ] + self._get_format_args() + ["pipe:1"]
 
-        self._proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        self._cmd = cmd
+        self._proc = await self.pool.acquire(self._name(), cmd)
 
         if not self._proc.stdin or not self._proc.stdout:
             raise RuntimeError("Failed to open ffmpeg pipes")
@@ -78,16 +85,8 @@ class FfmpegProc:
             except asyncio.CancelledError:
                 pass
 
-        if self._proc and self._proc.returncode is None:
-            try:
-                self._proc.terminate()
-                try:
-                    await asyncio.wait_for(self._proc.wait(), timeout=2.0)
-                except asyncio.TimeoutError:
-                    self._proc.kill()
-                    await self._proc.wait()
-            except ProcessLookupError:
-                pass
+        if self._proc:
+            await self.pool.release(self._cmd, self._proc)
 
     def __aiter__(self):
         return self
@@ -102,7 +101,7 @@ class FfmpegProc:
             except Exception as e:
                 raise RuntimeError(f"Input stream failed: {e}") from e
 
-        data = await self._proc.stdout.read(4096)
+        data = await self._proc.stdout.read(READ_SIZE)
 
         if data:
             return data
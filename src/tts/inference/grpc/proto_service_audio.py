@@ -1,3 +1,5 @@
+from contextlib import aclosing
+
 from grpclib import GRPCError, Status
 from kokoro import KPipeline
 
@@ -5,8 +7,9 @@ from core.logger import warn, error
 
 from models.definitions import ModelTTSAny
 from generated.tts_audio import ProtoAudioBase, AudioResp, AudioPost, PingRequest, PingResponse
+from tts.inference.sample_format import split_frames
 from tts.inference.schemas import TTSAudioPost
-from tts.inference.streaming_kokoro import stream_kokoro
+from tts.inference.scheduler import KokoroScheduler
 from tts.models import ModelRecordKokoro
 
 
@@ -21,7 +24,7 @@ class ProtoAudioService(ProtoAudioBase):
         self.model = model
         assert isinstance(self.model.record, ModelRecordKokoro) # todo: remove when >1 model
 
-        self._pipeline = pipeline
+        self._scheduler = KokoroScheduler(pipeline, self.model.record.constants.sample_rate)
 
     async def stream_audio(self, audio_post: AudioPost):
         try:
@@ -37,8 +40,10 @@ class ProtoAudioService(ProtoAudioBase):
             raise GRPCError(Status.FAILED_PRECONDITION, err)
 
         try:
-            async for audio in stream_kokoro(self._pipeline, post):
-                yield AudioResp(data=audio)
+            async with aclosing(self._scheduler.stream(post)) as stream:
+                async for audio in stream:
+                    for frame in split_frames(audio, post.frame_samples):
+                        yield AudioResp(data=frame)
 
         except Exception as e:
             err = f"failed to stream audio: {str(e)}"
@@ -1,6 +1,7 @@
 import asyncio
 
 from core import BASE_DIR
+from core.executors import configure_executors
 from core.logger import init_logger, info
 from models.config import Config, models_from_config
 from models.definitions import ModelTTSAny
@@ -22,6 +23,7 @@ def main():
     info("Logger initialized")
 
     config = Config.read_yaml()
+    configure_executors(config.executors)
     models = models_from_config(config)
 
     models = [m for m in models if isinstance(m, ModelTTSAny)]
@@ -0,0 +1,48 @@
+from typing import Iterator, Literal
+
+import numpy as np
+
+
+SampleFormat = Literal["float32", "int16"]
+
+INT16_SCALE = 32767.
+
+
+def encode_samples(samples: np.ndarray, sample_format: SampleFormat) -> np.ndarray:
+    """
+    Float32 samples in [-1, 1] as they go over the wire. Scales in place, so samples is consumed.
+    """
+    if sample_format == "float32":
+        return samples.astype(np.float32, copy=False)
+
+    np.multiply(samples, INT16_SCALE, out=samples)
+    np.clip(samples, -INT16_SCALE, INT16_SCALE, out=samples)
+    np.rint(samples, out=samples)
+    return samples.astype(np.int16)
+
+
+def decode_samples(data: bytes, sample_format: SampleFormat) -> bytes:
+    """
+    Float32 PCM bytes of a wire payload
+    """
+    if sample_format == "float32":
+        return data
+
+    samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+    samples *= 1. / INT16_SCALE
+    return samples.tobytes()
+
+
+def split_frames(samples: np.ndarray, frame_samples: int) -> Iterator[bytes]:
+    """
+    Bytes of consecutive frame_samples-long slices, the last one shorter; the whole buffer if frame_samples is 0.
+    Each frame is copied once, straight out of the samples.
+    """
+    buf = memoryview(np.ascontiguousarray(samples)).cast("B")
+    if frame_samples <= 0:
+        yield buf.tobytes()
+        return
+
+    step = frame_samples * samples.itemsize
+    for i in range(0, len(buf), step):
+        yield buf[i:i + step].tobytes()
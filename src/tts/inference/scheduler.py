@@ -0,0 +1,183 @@
+import asyncio
+import itertools
+import time
+
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, AsyncGenerator, Deque, List, Optional, Tuple
+
+import numpy as np
+
+from kokoro import KPipeline
+
+from core.executors import get_executor
+from core.logger import info, warn
+from tts.inference.sample_format import SampleFormat, encode_samples
+from tts.inference.schemas import TTSAudioPost
+
+
+MAX_PHONEMES = 510
+MIN_LEAD = 1.0 # seconds of audio a started stream should have ahead of real-time playback
+
+
+@dataclass(eq=False)
+class _Job:
+    id: int
+    post: TTSAudioPost
+    pack: Any
+    segments: Deque[str]
+    out: asyncio.Queue = field(default_factory=asyncio.Queue) # samples per segment, or the exception that ended the job
+    cancelled: bool = False
+
+    t_created: float = field(default_factory=time.monotonic)
+    t_first_audio: Optional[float] = None
+    audio_seconds: float = 0.
+    min_lead: Optional[float] = None
+    underruns: int = 0 # segments that finished after the audio before them had played out
+
+    def lead(self, now: float) -> float:
+        """
+        Audio handed out beyond what real-time playback has consumed since the first segment
+        """
+        assert self.t_first_audio is not None
+        return self.audio_seconds - (now - self.t_first_audio)
+
+
+class KokoroScheduler:
+    """
+    Single owner of the pipeline's model. Requests are phonemized up front on the decode executor, one at a time,
+    since the pipeline's g2p and voice cache are not thread-safe;
+    their segments are then synthesized one forward pass at a time, and each segment's audio is handed
+    to its request as soon as it is done, already in the request's wire sample format.
+    Next segment, by lead over real-time playback:
+    a stream that would underrun before another forward pass completes, then the first segment of a new request,
+    then a stream below MIN_LEAD (lowest lead first within both), then the remaining streams round-robin.
+    Lives on the server event loop.
+    """
+    def __init__(self, pipeline: KPipeline, sample_rate: int):
+        self._pipeline = pipeline
+        self._sample_rate = sample_rate
+        self._ids = itertools.count()
+        self._infer_seconds = 0.2 # moving average of one forward pass
+        self._phonemize_lock = Lock()
+
+        self._jobs: Deque[_Job] = deque()
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+
+    def _phonemize(self, post: TTSAudioPost) -> Tuple[List[str], Any]:
+        with self._phonemize_lock:
+            return self._phonemize_locked(post)
+
+    def _phonemize_locked(self, post: TTSAudioPost) -> Tuple[List[str], Any]:
+        _, tokens = self._pipeline.g2p(post.text)
+
+        segments = []
+        for _, ps, _ in self._pipeline.en_tokenize(tokens):
+            if not ps:
+                continue
+            if len(ps) > MAX_PHONEMES:
+                warn(f"Truncating segment of {len(ps)} phonemes")
+                ps = ps[:MAX_PHONEMES]
+            segments.append(ps)
+
+        pack = self._pipeline.load_voice(post.voice).to(self._pipeline.model.device)
+        return segments, pack
+
+    def _infer(self, ps: str, pack: Any, speed: float, sample_format: SampleFormat) -> np.ndarray:
+        output = KPipeline.infer(self._pipeline.model, ps, pack, speed)
+        return encode_samples(output.audio.numpy(), sample_format)
+
+    async def stream(self, post: TTSAudioPost) -> AsyncGenerator[np.ndarray, None]:
+        loop = asyncio.get_running_loop()
+        segments, pack = await loop.run_in_executor(get_executor("decode"), self._phonemize, post)
+        if not segments:
+            return
+
+        job = _Job(id=next(self._ids), post=post, pack=pack, segments=deque(segments))
+        self._jobs.append(job)
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        try:
+            for _ in range(len(segments)):
+                item = await job.out.get()
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+
+        finally:
+            job.cancelled = True
+            if job in self._jobs:
+                self._jobs.remove(job)
+            self._log_leads(job)
+
+    @staticmethod
+    def _log_leads(job: _Job) -> None:
+        if job.t_first_audio is None:
+            return
+        info(
+            f"TTS stream {job.id}: first audio after {job.t_first_audio - job.t_created:.3f}s, "
+            f"{job.audio_seconds:.1f}s of audio, min lead {job.min_lead:.2f}s, underruns {job.underruns}"
+        )
+
+    def _next_job(self) -> _Job:
+        now = time.monotonic()
+
+        leads = [(j.lead(now), j) for j in self._jobs if j.t_first_audio is not None]
+        critical = [(lead, j) for lead, j in leads if lead < 2 * self._infer_seconds]
+        low = [(lead, j) for lead, j in leads if lead < MIN_LEAD]
+        new = next((j for j in self._jobs if j.t_first_audio is None), None)
+
+        if critical:
+            job = min(critical, key=lambda x: x[0])[1]
+        elif new is not None:
+            job = new
+        elif low:
+            job = min(low, key=lambda x: x[0])[1]
+        else:
+            job = self._jobs[0]
+
+        self._jobs.remove(job)
+        return job
+
+    def _delivered(self, job: _Job, audio: np.ndarray) -> None:
+        now = time.monotonic()
+        if job.t_first_audio is None:
+            job.t_first_audio = now
+        elif job.lead(now) < 0:
+            job.underruns += 1
+
+        job.audio_seconds += len(audio) / self._sample_rate
+        lead = job.lead(now)
+        job.min_lead = lead if job.min_lead is None else min(job.min_lead, lead)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._wakeup.wait()
+            if not self._jobs:
+                self._wakeup.clear()
+                continue
+
+            job = self._next_job()
+            ps = job.segments.popleft()
+
+            try:
+                t0 = time.monotonic()
+                audio = await loop.run_in_executor(
+                    get_executor("inference"), self._infer, ps, job.pack, job.post.speed, job.post.sample_format
+                )
+                self._infer_seconds = 0.8 * self._infer_seconds + 0.2 * (time.monotonic() - t0)
+                self._delivered(job, audio)
+                job.out.put_nowait(audio)
+
+            except Exception as e:
+                job.segments.clear()
+                job.out.put_nowait(e)
+
+            if job.segments and not job.cancelled:
+                self._jobs.append(job)
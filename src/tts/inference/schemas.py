@@ -2,7 +2,8 @@ from typing import Self
 
 from pydantic import field_validator, BaseModel, Field
 
-from generated.tts_audio import AudioPost
+from generated.tts_audio import AudioPost, SampleFormat as ProtoSampleFormat
+from tts.inference.sample_format import SampleFormat
 
 
 class TTSAudioPost(BaseModel):
@@ -10,6 +11,8 @@ class TTSAudioPost(BaseModel):
     text: str
     voice: str
     speed: float = Field(gt=0.0, le=5.0, default=1.0)
+    sample_format: SampleFormat = "int16" # on the wire only: the client hands out float32 either way
+    frame_samples: int = Field(ge=0, le=240_000, default=4800) # 0.2s at 24kHz; 0 sends whole segments
 
     @classmethod
     def from_proto(cls, proto: AudioPost) -> Self:
@@ -18,6 +21,8 @@ class TTSAudioPost(BaseModel):
             text=proto.text,
             voice=proto.voice,
             speed=proto.speed,
+            sample_format="int16" if proto.sample_format == ProtoSampleFormat.INT16 else "float32",
+            frame_samples=proto.frame_samples,
         )
 
     def into_proto(self) -> AudioPost:
@@ -26,6 +31,8 @@ class TTSAudioPost(BaseModel):
             text=self.text,
             voice=self.voice,
             speed=self.speed,
+            sample_format=ProtoSampleFormat.INT16 if self.sample_format == "int16" else ProtoSampleFormat.FLOAT32,
+            frame_samples=self.frame_samples,
         )
 
     @classmethod
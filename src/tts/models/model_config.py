@@ -1,7 +1,8 @@
-from typing import Optional, Any, Literal
+from typing import Optional, Any, Literal, List
 
 from pydantic import BaseModel, Field
 
+from models.admission import AdmissionParams
 from tts.models.model_record import ParamsKokoro
 
 
@@ -9,9 +10,16 @@ class ModelConfigBase(BaseModel):
     model: str
     backend: Any
     container: str
+    replicas: List[str] = Field(default_factory=list) # additional containers serving the same model
+    admission: AdmissionParams = Field(default_factory=AdmissionParams)
+    lookahead: int = Field(ge=0, le=8, default=2) # voice chat batches synthesized ahead of the one being streamed
 
     params: Optional[Any] = None
 
+    @property
+    def containers(self) -> List[str]:
+        return [self.container, *self.replicas]
+
 
 class ModelConfigKokoro(ModelConfigBase):
     backend: Literal["kokoro"]
@@ -2,6 +2,7 @@ import asyncio
 
 import aiohttp
 
+from core.grpc import ChannelPool
 from core.logger import error
 from core.status.models import Task, TaskType
 from models.definitions import ModelTTSAny
@@ -16,26 +17,28 @@ STARTUP_TIME: float = 360.
 async def task_worker(
         loop: asyncio.AbstractEventLoop,
         _a_session: aiohttp.ClientSession,
+        channels: ChannelPool,
         t0: float,
         task: Task,
 ):
     assert isinstance(task.model, ModelTTSAny)
     assert isinstance(task.model.record, ModelRecordKokoro) # todo: remove when >1 model
 
-    host = task.model.config.container
+    host = task.replica.address
+    status = task.replica.status
     model_name = task.model.record.model
 
     try:
         if task.task_type == TaskType.ping:
-            is_alive, err = await ping_tts(host)
+            is_alive, err = await ping_tts(channels, host)
 
             if is_alive:
-                task.model.status.ping_ok = True
+                status.ping_ok = True
             else:
                 if loop.time() - t0 > STARTUP_TIME:
-                    task.model.status.ping_ok = False
-                    task.model.status.error = err
-                    error(f"MODEL {model_name}: {err}")
+                    status.ping_ok = False
+                    status.error = err
+                    error(f"MODEL {model_name} @ {host}: {err}")
 
         elif task.task_type == TaskType.request:
             post = TTSAudioPost(
@@ -45,29 +48,29 @@ async def task_worker(
             )
 
             has_response = False
-            async for _response in stream_audio(host, post):
+            async for _response in stream_audio(channels, task.replica, post):
                 has_response = True
             if has_response:
-                task.model.status.request_ok = True
-                if task.model.status.error is not None:
-                    task.model.status.error = None
+                status.request_ok = True
+                if status.error is not None:
+                    status.error = None
             else:
                 if loop.time() - t0 > STARTUP_TIME:
                     err = "REQUEST FAILED: Stream yielded no events"
-                    task.model.status.request_ok = False
-                    task.model.status.error = err
-                    error(f"MODEL {model_name}: {err}")
+                    status.request_ok = False
+                    status.error = err
+                    error(f"MODEL {model_name} @ {host}: {err}")
 
         else:
             raise ValueError(f"Unknown task type: {task.task_type}")
 
     except Exception as e:
         if task.task_type == TaskType.ping:
-            task.model.status.ping_ok = False
+            status.ping_ok = False
         elif task.task_type == TaskType.request:
-            task.model.status.request_ok = False
+            status.request_ok = False
 
         if loop.time() - t0 > STARTUP_TIME:
             err = f"RPC ERROR: {str(e)}"
-            task.model.status.error = err
-            error(f"MODEL {model_name}: {err}")
+            status.error = err
+            error(f"MODEL {model_name} @ {host}: {err}")
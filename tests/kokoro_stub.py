@@ -0,0 +1,84 @@
+"""
+Stand-ins for kokoro's KPipeline, enough for the TTS server without torch or the model weights
+"""
+import sys
+import threading
+import time
+import types
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+SEGMENT_SAMPLES = 2400
+
+
+class KPipeline:
+    @staticmethod
+    def infer(model, ps, pack, speed):
+        return model(ps, pack, speed)
+
+
+if "kokoro" not in sys.modules:
+    try:
+        import kokoro # noqa: F401
+    except ImportError:
+        kokoro = types.ModuleType("kokoro")
+        setattr(kokoro, "KPipeline", KPipeline)
+        sys.modules["kokoro"] = kokoro
+
+
+class StubTensor:
+    def __init__(self, array: np.ndarray):
+        self.array = array
+
+    def numpy(self) -> np.ndarray:
+        return self.array
+
+    def to(self, device: str) -> "StubTensor":
+        return self
+
+
+@dataclass
+class StubOutput:
+    audio: StubTensor
+
+
+class StubModel:
+    device = "cpu"
+
+    def __call__(self, ps: str, pack: StubTensor, speed: float) -> StubOutput:
+        return StubOutput(audio=StubTensor(np.full(SEGMENT_SAMPLES, 0.5, dtype=np.float32)))
+
+
+class StubPipeline:
+    """
+    One segment per sentence; records how many threads were inside g2p or load_voice at once
+    """
+    def __init__(self, delay: float = 0.):
+        self.model = StubModel()
+        self.delay = delay
+        self.max_concurrent = 0
+        self._inside = 0
+        self._lock = threading.Lock()
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._inside += 1
+            self.max_concurrent = max(self.max_concurrent, self._inside)
+        time.sleep(self.delay)
+        with self._lock:
+            self._inside -= 1
+
+    def g2p(self, text: str):
+        self._enter()
+        return text, [s for s in text.split(".") if s.strip()]
+
+    def en_tokenize(self, tokens):
+        for sentence in tokens:
+            yield sentence, sentence.strip(), None
+
+    def load_voice(self, voice: str) -> StubTensor:
+        self._enter()
+        return StubTensor(np.zeros(1, dtype=np.float32))
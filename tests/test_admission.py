@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from core.routers.oai.utils import AdmittedStreamingResponse, release_after
+from models.admission import AdmissionLimiter, AdmissionParams, AdmissionRejected, Priority
+
+
+def limiter(max_in_flight: int = 1, **kwargs) -> AdmissionLimiter:
+    return AdmissionLimiter("test", AdmissionParams(max_in_flight=max_in_flight, **kwargs))
+
+
+async def test_timeout_after_handover_frees_the_slot(monkeypatch):
+    lim = limiter(queue_timeout=1.)
+    held = await lim.acquire()
+
+    async def wait_for(waiter, timeout):
+        held.release() # hands the slot to the waiter ...
+        raise asyncio.TimeoutError # ... in the same iteration the deadline hits
+
+    monkeypatch.setattr(asyncio, "wait_for", wait_for)
+    with pytest.raises(AdmissionRejected):
+        await lim.acquire()
+
+    assert lim.stats().in_flight == 0
+
+
+async def test_cancel_after_handover_frees_the_slot():
+    lim = limiter()
+    held = await lim.acquire()
+
+    task = asyncio.create_task(lim.acquire())
+    await asyncio.sleep(0)
+    held.release()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert lim.stats().in_flight == 0
+
+
+async def test_interactive_goes_first():
+    lim = limiter()
+    held = await lim.acquire()
+
+    order = []
+
+    async def acquire(priority: Priority):
+        ticket = await lim.acquire(priority)
+        order.append(priority)
+        ticket.release()
+
+    tasks = [asyncio.create_task(acquire(p)) for p in (Priority.batch, Priority.interactive)]
+    await asyncio.sleep(0)
+    held.release()
+    await asyncio.gather(*tasks)
+
+    assert order == [Priority.interactive, Priority.batch]
+
+
+async def test_yielded_batch_is_not_displaced():
+    lim = limiter(max_queue=1)
+    batch = await lim.acquire(Priority.batch)
+
+    first = asyncio.create_task(lim.acquire(Priority.interactive))
+    await asyncio.sleep(0)
+    yielding = asyncio.create_task(batch.yield_to_interactive()) # the slot goes to `first`, batch waits requeued
+    await asyncio.sleep(0)
+    assert lim.stats().queued_batch == 1
+
+    second = asyncio.create_task(lim.acquire(Priority.interactive)) # queue is full, nothing may be displaced
+    with pytest.raises(AdmissionRejected):
+        await second
+    assert not yielding.done()
+
+    (await first).release()
+    await yielding
+    batch.release()
+    assert lim.stats().in_flight == 0
+    assert lim.stats().displaced == 0
+
+
+def streaming_app(lim: AdmissionLimiter, started: list) -> Starlette:
+    async def body():
+        started.append(True)
+        yield b"chunk"
+
+    async def endpoint(request):
+        tickets = [await lim.acquire(Priority.interactive)]
+        return AdmittedStreamingResponse(release_after(body(), tickets), tickets, media_type="text/plain")
+
+    return Starlette(routes=[Route("/", endpoint)])
+
+
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+async def test_disconnect_before_first_chunk_releases_tickets(spec_version):
+    lim = limiter()
+    started = []
+    app = streaming_app(lim, started)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": spec_version}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+        "headers": [], "server": ("test", 80), "client": ("test", 1234),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if spec_version == "2.3":
+            await asyncio.Event().wait() # the client is gone, the headers never get out
+        raise OSError("client disconnected")
+
+    try:
+        await asyncio.wait_for(app(scope, receive, send), timeout=2.)
+    except Exception:
+        pass
+
+    assert not started
+    assert lim.stats().in_flight == 0
+    await asyncio.wait_for(lim.acquire(), timeout=1.)
@@ -0,0 +1,241 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+
+from aiohttp import web
+from fastapi import FastAPI, Request
+from starlette.responses import StreamingResponse
+
+from core.cache import PcmCache
+from core.ffmpeg import FfmpegPool
+from core.grpc import ChannelPool
+from core.routers.disconnect import DisconnectWatch
+from core.routers.oai.router_chat_completions import OAIChatCompletionsRouter
+from core.routers.oai.schemas import ChatPost
+from llm.client import stream_with_chat
+from llm.models.model_config import ModelConfigLocalLlamaCpp, ModelLocalBackend
+from llm.models.model_record import ModelRecordLlamaCpp
+from llm.models.models import ModelLocal
+from llm.models.records import RECORDS
+from llm.models.urls import URLsLlamaCpp
+from llm.tokens import TokenCounter
+from models.admission import AdmissionLimiter, AdmissionParams
+from models.affinity import PrefixAffinity
+from models.replicas import Replica
+
+
+STALL = 30. # seconds the stub sits in prefill or between tokens; a test passing means it was cut short
+
+
+class StubLlamaCpp:
+    """
+    llama.cpp stand-in: stalls in prefill, or streams a few tokens and then stalls; records when its client goes away
+    """
+    def __init__(self, prefill: bool):
+        self.prefill = prefill
+        self.requested = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.frames = 0
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        post = await request.json()
+        self.requested.set()
+        try:
+            if self.prefill or not post.get("stream"):
+                await asyncio.sleep(STALL) # like llama.cpp, no headers before the first token
+                return web.json_response({})
+
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+
+            for i in range(1000):
+                frame = {
+                    "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0, "model": "stub",
+                    "choices": [{"index": 0, "delta": {"content": f"tok{i}"}, "finish_reason": None}],
+                }
+                await response.write(f"data: {json.dumps(frame)}\n\n".encode())
+                self.frames += 1
+                await asyncio.sleep(STALL if i >= 2 else 0.01)
+            return response
+
+        except asyncio.CancelledError:
+            self.closed.set()
+            raise
+
+
+@pytest.fixture
+async def upstream(request):
+    stub = StubLlamaCpp(prefill=request.param == "prefill")
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", stub.chat_completions)
+
+    # handler_cancellation: the handler learns about a closed connection at once, not on its next write
+    runner = web.AppRunner(app, handler_cancellation=True)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    yield stub, f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+class FakeTokenizer:
+    def __call__(self, texts, add_special_tokens=False):
+        return {"input_ids": [t.split() for t in texts]}
+
+
+def stub_model(url: str) -> ModelLocal:
+    record = next(r for r in RECORDS if isinstance(r, ModelRecordLlamaCpp))
+    record = record.model_copy(update={"urls": URLsLlamaCpp(url=url)})
+    config = ModelConfigLocalLlamaCpp(
+        model=record.resolve_name, container="stub", port=8080, backend=ModelLocalBackend.llamacpp
+    )
+
+    replica = Replica(address=url)
+    replica.status.ping_ok = True
+    replica.status.request_ok = True
+
+    return ModelLocal(
+        tokenizer=FakeTokenizer(),
+        token_counter=TokenCounter(FakeTokenizer()),
+        replicas=[replica],
+        admission=AdmissionLimiter(record.resolve_name, AdmissionParams(max_in_flight=1)),
+        affinity=PrefixAffinity(record.resolve_name, [replica]),
+        record=record,
+        config=config,
+    )
+
+
+class AsgiClient:
+    """
+    Drives one request through an ASGI app the way uvicorn does, with a disconnect on demand
+    """
+    def __init__(self, app, spec_version: str):
+        self.app = app
+        self.spec_version = spec_version
+        self.disconnected = asyncio.Event()
+        self.chunks = []
+        self.first_chunk = asyncio.Event()
+
+    async def post(self, path: str, body: dict) -> None:
+        raw = json.dumps(body).encode()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": self.spec_version}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "headers": [(b"content-type", b"application/json")],
+            "server": ("test", 80), "client": ("test", 1234),
+        }
+        sent_body = False
+
+        async def receive():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": raw, "more_body": False}
+            await self.disconnected.wait() # every pending receive() learns about it, as with uvicorn
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if self.disconnected.is_set():
+                raise OSError("client disconnected")
+            if message["type"] == "http.response.body" and message.get("body"):
+                self.chunks.append(message["body"])
+                self.first_chunk.set()
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            pass # ClientDisconnect from the final send
+
+
+def chat_app(model: ModelLocal, session: aiohttp.ClientSession) -> FastAPI:
+    app = FastAPI()
+    app.include_router(OAIChatCompletionsRouter(
+        models=[model],
+        http_session=session,
+        grpc_channels=ChannelPool(),
+        speech_memo=PcmCache("test", None),
+        ffmpeg_pool=FfmpegPool(),
+    ))
+    return app
+
+
+def chat_body(model: ModelLocal, stream: bool) -> dict:
+    return {"model": model.record.resolve_name, "messages": [{"role": "user", "content": "hi"}], "stream": stream}
+
+
+async def assert_upstream_closed(stub: StubLlamaCpp, model: ModelLocal, request: asyncio.Task) -> None:
+    await asyncio.wait_for(stub.closed.wait(), timeout=2.)
+    await asyncio.wait_for(request, timeout=2.)
+    assert model.admission.stats().in_flight == 0
+    assert model.replicas[0].in_flight == 0
+
+
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+@pytest.mark.parametrize("upstream", ["generation"], indirect=True)
+async def test_disconnect_mid_generation_closes_upstream(upstream, spec_version):
+    stub, url = upstream
+    model = stub_model(url)
+
+    async with aiohttp.ClientSession() as session:
+        client = AsgiClient(chat_app(model, session), spec_version)
+        request = asyncio.create_task(client.post("/oai/v1/chat/completions", chat_body(model, stream=True)))
+
+        await asyncio.wait_for(client.first_chunk.wait(), timeout=2.)
+        while stub.frames < 3:
+            await asyncio.sleep(0.01)
+        client.disconnected.set()
+
+        await assert_upstream_closed(stub, model, request)
+        assert b"tok0" in b"".join(client.chunks)
+
+
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+@pytest.mark.parametrize("stream", [True, False])
+@pytest.mark.parametrize("upstream", ["prefill"], indirect=True)
+async def test_disconnect_during_prefill_closes_upstream(upstream, spec_version, stream):
+    stub, url = upstream
+    model = stub_model(url)
+
+    async with aiohttp.ClientSession() as session:
+        client = AsgiClient(chat_app(model, session), spec_version)
+        request = asyncio.create_task(client.post("/oai/v1/chat/completions", chat_body(model, stream=stream)))
+
+        await asyncio.wait_for(stub.requested.wait(), timeout=2.)
+        client.disconnected.set()
+
+        await assert_upstream_closed(stub, model, request)
+
+
+@pytest.mark.parametrize("upstream", ["generation", "prefill"], indirect=True)
+async def test_stream_with_chat_closes_upstream(upstream):
+    stub, url = upstream
+    model = stub_model(url)
+
+    async with aiohttp.ClientSession() as session:
+        app = FastAPI()
+
+        @app.post("/chat")
+        async def chat(post: ChatPost, request: Request):
+            disconnect = DisconnectWatch(request)
+
+            async def frames():
+                async for chunk in stream_with_chat(session, model, post, disconnect):
+                    yield chunk.model_dump_json()
+
+            return StreamingResponse(disconnect.guard(frames()), media_type="text/event-stream")
+
+        client = AsgiClient(app, "2.4")
+        request = asyncio.create_task(client.post("/chat", chat_body(model, stream=True)))
+
+        await asyncio.wait_for(stub.requested.wait(), timeout=2.)
+        if not stub.prefill:
+            await asyncio.wait_for(client.first_chunk.wait(), timeout=2.)
+        client.disconnected.set()
+
+        await asyncio.wait_for(stub.closed.wait(), timeout=2.)
+        await asyncio.wait_for(request, timeout=2.)
+        assert model.replicas[0].in_flight == 0
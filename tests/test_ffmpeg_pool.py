@@ -0,0 +1,69 @@
+import asyncio
+
+from typing import cast
+
+from core.ffmpeg import FfmpegPool
+
+
+class FakeProcess:
+    returncode = None
+
+    def __init__(self):
+        self.reaped = False
+
+    def terminate(self):
+        self.returncode = 0
+
+    def kill(self):
+        self.returncode = -9
+
+    async def wait(self):
+        self.reaped = True
+        return self.returncode
+
+
+def fake_pool(spares_per_command: int) -> tuple[FfmpegPool, list[FakeProcess]]:
+    spawned = []
+
+    async def spawn(cmd) -> asyncio.subprocess.Process:
+        await asyncio.sleep(0.01)
+        proc = FakeProcess()
+        spawned.append(proc)
+        return cast(asyncio.subprocess.Process, proc)
+
+    return FfmpegPool(spares_per_command=spares_per_command, spawn=spawn), spawned
+
+
+async def test_burst_keeps_spares_per_command():
+    pool, spawned = fake_pool(spares_per_command=2)
+    cmd = ["ffmpeg", "-i", "pipe:0"]
+
+    procs = await asyncio.gather(*(pool.acquire("test", cmd) for _ in range(10)))
+    await asyncio.sleep(0.1)
+
+    assert len(spawned) == 10 + 2 # each cold acquire spawns its own, plus one refill of the spares
+    assert pool.stats()[0].spares == 2
+
+    for proc in procs:
+        await pool.release(cmd, proc)
+    stats = pool.stats()[0]
+    assert (stats.active, stats.cold) == (0, 10)
+
+    proc = await pool.acquire("test", cmd)
+    assert pool.stats()[0].warm == 1
+    await pool.release(cmd, proc)
+    await pool.close()
+
+
+async def test_close_reaps_spares_and_stops_refills():
+    pool, spawned = fake_pool(spares_per_command=2)
+    cmd = ["ffmpeg", "-i", "pipe:0"]
+
+    await pool.release(cmd, await pool.acquire("test", cmd))
+    await asyncio.sleep(0.015) # the refill has spawned one spare and waits for the next
+    await pool.close()
+    await asyncio.sleep(0.05)
+
+    assert len(spawned) == 2
+    assert all(p.returncode is not None and p.reaped for p in spawned)
+    assert pool.stats()[0].spares == 0
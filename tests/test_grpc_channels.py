@@ -0,0 +1,42 @@
+from grpclib.exceptions import StreamTerminatedError
+
+from core.grpc import ChannelPool, is_connection_lost
+
+
+HOST = "127.0.0.1"
+PORT = 50599
+
+
+def test_is_connection_lost():
+    assert is_connection_lost(StreamTerminatedError("Connection lost"))
+    assert is_connection_lost(ConnectionResetError())
+    assert not is_connection_lost(StreamTerminatedError("Stream reset by remote party, error_code: 8"))
+
+
+async def test_discard_drains_live_streams():
+    pool = ChannelPool()
+    closed = []
+
+    with pool.stream(HOST, PORT) as channel, pool.stream(HOST, PORT):
+        channel.close = lambda: closed.append(channel)
+        pool.discard(HOST, PORT, channel)
+        assert not closed # the other stream still runs over it
+
+        with pool.stream(HOST, PORT) as fresh:
+            assert fresh is not channel
+            fresh.close()
+
+    assert closed == [channel]
+    assert pool.stats()[0].discarded == 1
+
+
+async def test_discard_idle_channel_closes_at_once():
+    pool = ChannelPool()
+    closed = []
+
+    channel = pool.get(HOST, PORT)
+    channel.close = lambda: closed.append(channel)
+    pool.discard(HOST, PORT, channel)
+    pool.discard(HOST, PORT, channel)
+
+    assert closed == [channel]
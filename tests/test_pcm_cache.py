@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+from core.cache import PcmCache
+
+
+async def test_concurrent_disk_hits_count_once(tmp_path):
+    data = b"\x00" * 1000
+    await PcmCache("test", tmp_path).put("key", data)
+
+    cache = PcmCache("test", tmp_path) # same directory, nothing in memory yet
+    results = await asyncio.gather(cache.get("key"), cache.get("key"))
+
+    assert results == [data, data]
+    stats = cache.stats()
+    assert stats.hits_disk == 2
+    assert stats.memory_entries == 1
+    assert stats.memory_bytes == len(data)
+
+
+async def test_memory_lru_evicts_by_bytes():
+    cache = PcmCache("test", None, max_memory_bytes=250)
+    for key in ("a", "b", "c"):
+        await cache.put(key, b"\x00" * 100)
+
+    assert "a" not in cache
+    assert await cache.get("c") is not None
+    assert cache.stats().memory_bytes == 200
+
+
+async def test_disk_eviction_unlinks_off_the_loop(tmp_path, monkeypatch):
+    cache = PcmCache("test", tmp_path, max_memory_bytes=0, max_disk_bytes=250)
+    unlinked_by = []
+
+    def unlink_files(paths):
+        unlinked_by.append(threading.current_thread())
+        PcmCache._unlink_files(cache, paths)
+
+    monkeypatch.setattr(cache, "_unlink_files", unlink_files)
+    for key in ("a", "b", "c"):
+        await cache.put(key, b"\x00" * 100)
+
+    assert unlinked_by and threading.main_thread() not in unlinked_by
+    assert sorted(f.stem for f in tmp_path.glob("*/*.pcm")) == ["b", "c"]
+    assert cache.stats().evictions_disk == 1
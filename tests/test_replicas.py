@@ -0,0 +1,28 @@
+import pytest
+
+from models.replicas import NoReplicaAvailable, Replica, ReplicaLease
+
+
+def running(address: str) -> Replica:
+    replica = Replica(address=address)
+    replica.status.ping_ok = True
+    replica.status.request_ok = True
+    return replica
+
+
+def test_lease_counts_from_the_pick():
+    replicas = [running("a"), running("b")]
+
+    first = ReplicaLease(replicas)
+    second = ReplicaLease(replicas) # sees the first one in flight already
+    assert {first.replica.address, second.replica.address} == {"a", "b"}
+
+    first.release()
+    first.release()
+    assert first.replica.in_flight == 0
+    assert second.replica.in_flight == 1
+
+
+def test_lease_without_running_replicas():
+    with pytest.raises(NoReplicaAvailable):
+        ReplicaLease([Replica(address="a")])
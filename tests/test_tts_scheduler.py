@@ -0,0 +1,29 @@
+import asyncio
+
+from typing import cast
+
+from kokoro_stub import SEGMENT_SAMPLES, StubPipeline
+
+from kokoro import KPipeline
+
+from tts.inference.scheduler import KokoroScheduler
+from tts.inference.schemas import TTSAudioPost
+
+
+def post(text: str) -> TTSAudioPost:
+    return TTSAudioPost(model="kokoro", text=text, voice="af_heart")
+
+
+async def collect(scheduler: KokoroScheduler, text: str) -> list:
+    return [audio async for audio in scheduler.stream(post(text))]
+
+
+async def test_concurrent_requests_phonemize_one_at_a_time():
+    pipeline = StubPipeline(delay=0.02)
+    scheduler = KokoroScheduler(cast(KPipeline, pipeline), 24000)
+
+    results = await asyncio.gather(*(collect(scheduler, "One. Two.") for _ in range(4)))
+
+    assert pipeline.max_concurrent == 1
+    for segments in results:
+        assert [len(s) for s in segments] == [SEGMENT_SAMPLES, SEGMENT_SAMPLES]
@@ -0,0 +1,29 @@
+from typing import cast
+
+from kokoro_stub import SEGMENT_SAMPLES, StubPipeline
+
+from kokoro import KPipeline
+
+from generated.tts_audio import AudioPost, SampleFormat
+from tts.inference.grpc.proto_service_audio import ProtoAudioService
+from tts.models import ModelConfigKokoro
+from tts.models.models import Model
+from tts.models.records import RECORDS
+
+
+def service() -> ProtoAudioService:
+    model = Model.new(RECORDS[0], ModelConfigKokoro(model="kokoro", backend="kokoro", container="tts"))
+    return ProtoAudioService(model, cast(KPipeline, StubPipeline()))
+
+
+async def test_stream_audio_sends_frames():
+    post = AudioPost(
+        model="kokoro", text="One. Two.", voice="af_heart", speed=1.,
+        sample_format=SampleFormat.INT16, frame_samples=1000,
+    )
+    frames = [resp.data async for resp in service().stream_audio(post)]
+
+    assert all(type(f) is bytes for f in frames)
+    # per segment: 1000 + 1000 + 400 int16 samples
+    assert [len(f) for f in frames] == [2000, 2000, 800] * 2
+    assert sum(len(f) for f in frames) == 2 * SEGMENT_SAMPLES * 2